@@ -0,0 +1,88 @@
+"""
+Bounded chat history for a session.
+
+The most recent MAX_WINDOW_MESSAGES messages are kept verbatim. Older ones are
+folded into a rolling summary of one short line per message, itself capped at
+MAX_SUMMARY_LINES, so session memory and what is drawn on each rerun stay the
+same size however long the conversation runs. Each message's HTML is rendered
+once, when it is added; a rerun only joins the stored fragments.
+"""
+import html
+import re
+from collections import deque
+from typing import Any, Dict, Iterator, List
+
+MAX_WINDOW_MESSAGES = 20  # Messages kept verbatim
+MAX_SUMMARY_LINES = 10  # One line per summarized message; the oldest are dropped
+SUMMARY_LINE_CHARS = 120
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+ROLE_LABELS = {'user': 'You', 'assistant': 'Assistant'}
+
+
+def summarize_message(message: Dict[str, Any], max_chars: int = SUMMARY_LINE_CHARS) -> str:
+    """One line for a message: its role and first sentence, truncated"""
+    text = ' '.join(str(message.get('content') or '').split())
+    text = SENTENCE_END.split(text, 1)[0]
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(' ', 1)[0] + '...'
+    return f"{ROLE_LABELS.get(message.get('role'), message.get('role'))}: {text}"
+
+
+def message_html(message: Dict[str, Any]) -> str:
+    """
+    A message as a single line of HTML. It is embedded in an indented markdown
+    template, where a raw newline would break the dedent and turn the rest into
+    a code block, so line breaks become <br>.
+    """
+    content = '<br>'.join(html.escape(line) for line in str(message["content"]).splitlines())
+    return f'<div class="{html.escape(str(message["role"]))}-message">{content}</div>'
+
+
+class ChatHistory:
+    """Recent messages plus a rolling summary of the ones before them"""
+    def __init__(self, max_messages: int = MAX_WINDOW_MESSAGES, max_summary_lines: int = MAX_SUMMARY_LINES):
+        self.max_messages = max_messages
+        self.window: "deque[Dict[str, Any]]" = deque()
+        self.summary: "deque[str]" = deque(maxlen=max_summary_lines)
+        self.summarized_count = 0  # Messages folded into the summary so far, including dropped lines
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.window)
+
+    def __len__(self) -> int:
+        return len(self.window)
+
+    def append(self, role: str, content: str):
+        """Add a message, summarizing the oldest one once the window is full"""
+        message = {"role": role, "content": content}
+        message["html"] = message_html(message)
+        self.window.append(message)
+        while len(self.window) > self.max_messages:
+            self.summary.append(summarize_message(self.window.popleft()))
+            self.summarized_count += 1
+
+    @property
+    def messages(self) -> List[Dict[str, str]]:
+        """The recent messages as role/content dicts"""
+        return [{"role": m["role"], "content": m["content"]} for m in self.window]
+
+    def summary_text(self) -> str:
+        """The rolling summary, oldest line first; empty until a message has been summarized"""
+        if not self.summarized_count:
+            return ""
+        lines = list(self.summary)
+        dropped = self.summarized_count - len(lines)
+        if dropped:
+            lines.insert(0, f"({dropped} earlier messages not shown)")
+        return '\n'.join(lines)
+
+    def render_html(self) -> str:
+        """HTML for the summary and recent messages, built from fragments rendered on append"""
+        parts = []
+        summary = self.summary_text()
+        if summary:
+            lines = '<br>'.join(html.escape(line) for line in summary.split('\n'))
+            parts.append(f'<div class="chat-summary">{lines}</div>')
+        parts.extend(m["html"] for m in self.window)
+        return ''.join(parts)
@@ -1,34 +1,50 @@
 import streamlit as st
 from chatbot import NewsAssistant
+from chat_history import ChatHistory
 
 def initialize_chat():
     """Initialize chat session state"""
     if 'messages' not in st.session_state:
-        st.session_state.messages = []
+        st.session_state.messages = ChatHistory()
     if 'news_assistant' not in st.session_state:
         st.session_state.news_assistant = NewsAssistant()
 
-def display_chat_interface():
-    """Display the chat interface in the sidebar"""
-    initialize_chat()
-    
-    st.sidebar.title("News Assistant 🤖")
-    
+@st.fragment
+def chat_fragment():
+    """
+    Chat history and input. As a fragment, sending a message reruns only this
+    function, so the rest of the page is not re-executed during a chat turn.
+    """
+    # Older turns are shown as a summary; only the recent window is drawn in full
+    summary = st.session_state.messages.summary_text()
+    if summary:
+        with st.expander("Earlier in this chat"):
+            st.text(summary)
+
     # Display chat messages
     for message in st.session_state.messages:
-        with st.sidebar.chat_message(message["role"]):
+        with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
     # Chat input
-    if prompt := st.sidebar.chat_input("Ask about news..."):
+    if prompt := st.chat_input("Ask about news..."):
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        st.session_state.messages.append("user", prompt)
+        with st.chat_message("user"):
+            st.markdown(prompt)
         
         # Get context from current filters
         context = st.session_state.get('filters', {})
         
-        # Get bot response
-        with st.sidebar.chat_message("assistant"):
-            response = st.session_state.news_assistant.get_response(prompt, context)
-            st.markdown(response)
-            st.session_state.messages.append({"role": "assistant", "content": response})
+        # Stream the bot response as it is generated
+        with st.chat_message("assistant"):
+            response = st.write_stream(st.session_state.news_assistant.stream_response(prompt, context))
+            st.session_state.messages.append("assistant", response)
+
+def display_chat_interface():
+    """Display the chat interface in the sidebar"""
+    initialize_chat()
+    
+    with st.sidebar:
+        st.title("News Assistant 🤖")
+        chat_fragment()
@@ -97,4 +97,23 @@ def get_cached_analysis(topic, max_age_hours=1):
         return result['data'] if result else None
     finally:
         cur.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+def get_recent_articles(days=7, limit=5000):
+    """The newest stored articles from the last `days` days, for the chatbot's article index"""
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+
+    try:
+        cur.execute('''
+            SELECT title, content, url, source, published_at
+            FROM articles
+            WHERE published_at >= NOW() - make_interval(days => %s)
+            ORDER BY published_at DESC
+            LIMIT %s
+        ''', (days, limit))
+        # Oldest first, so the newest articles are the last to be evicted from the index
+        return list(reversed(cur.fetchall()))
+    finally:
+        cur.close()
+        conn.close()
@@ -0,0 +1,63 @@
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional
+
+# GDELT seendate, e.g. 20241210T140000Z
+GDELT_PATTERN = re.compile(r'^(\d{4})(\d{2})(\d{2})T?(\d{2})(\d{2})(\d{2})Z?$')
+
+# Fallback formats tried after the fast paths
+EXTRA_FORMATS = (
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%d %b %Y %H:%M:%S %z',
+    '%a, %d %b %Y %H:%M %z',
+    '%B %d, %Y %I:%M %p',
+    '%Y/%m/%d %H:%M:%S',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y',
+)
+
+
+def _with_timezone(value: datetime) -> datetime:
+    """Assume UTC for naive datetimes"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+@lru_cache(maxsize=8192)
+def parse_date(date_str: str) -> Optional[datetime]:
+    """
+    Parse RFC-822 (RSS pubDate), ISO 8601 (Atom), GDELT seendate and a few common
+    variants into a timezone-aware datetime. Returns None if nothing matches.
+    Results are memoized since feeds repeat the same timestamps across requests.
+    """
+    if not date_str:
+        return None
+    value = date_str.strip()
+    if not value:
+        return None
+
+    if value[0].isdigit():
+        match = GDELT_PATTERN.match(value)
+        if match:
+            return datetime(*map(int, match.groups()), tzinfo=timezone.utc)
+        try:
+            return _with_timezone(datetime.fromisoformat(value))
+        except ValueError:
+            pass
+
+    try:
+        # RFC-822/2822, including named zones such as GMT, EST and UT
+        return _with_timezone(parsedate_to_datetime(value))
+    except (TypeError, ValueError, IndexError):
+        pass
+
+    for fmt in EXTRA_FORMATS:
+        try:
+            return _with_timezone(datetime.strptime(value, fmt))
+        except ValueError:
+            continue
+
+    return None
@@ -0,0 +1,131 @@
+"""
+Outlet logos served from our own origin.
+
+The first time a domain is seen its logo is fetched from Clearbit in the
+background, resized and stored as static/logos/<domain>.png. Until then, and
+for domains without a logo, cards show the bundled placeholder, so rendering
+never waits on a third-party CDN.
+"""
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from services import lazy_import
+from static_assets import STATIC_ROOT, data_url, static_serving_enabled, static_url, write_static_file
+
+LOGO_SUBDIR = 'logos'
+LOGO_SIZE = 120  # Pixels; cards show logos at 60px, doubled for high-density screens
+LOGO_SOURCE_URL = "https://logo.clearbit.com/{domain}"
+PLACEHOLDER_SOURCE = os.path.join(STATIC_ROOT, 'brand', 'favicons', 'browser.png')
+FAILURE_RETRY_SECONDS = 24 * 3600  # Domains without a logo are retried once a day
+
+_logo_urls: Dict[str, str] = {}  # domain -> URL of the stored logo
+_failures: Dict[str, float] = {}  # domain -> time the last fetch failed
+_pending = set()
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="logo-fetch")
+
+
+def normalize_domain(source: str) -> str:
+    """Domain key for a source name or URL: lowercase, no scheme, path, port or www."""
+    source = (source or '').strip().lower()
+    host = urlsplit(source).hostname if '://' in source else source.split('/')[0].split(':')[0]
+    host = host or ''
+    return host[4:] if host.startswith('www.') else host
+
+
+def _logo_path(domain: str) -> str:
+    return os.path.join(STATIC_ROOT, LOGO_SUBDIR, f"{domain}.png")
+
+
+def _served_url(path: str) -> str:
+    if static_serving_enabled():
+        return static_url(path)
+    with open(path, 'rb') as f:
+        return data_url(f.read(), 'png')
+
+
+def _resize_png(data: bytes) -> bytes:
+    Image = lazy_import('PIL.Image')
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert('RGBA')
+        img.thumbnail((LOGO_SIZE, LOGO_SIZE))
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def _fetch_logo(domain: str):
+    try:
+        response = requests.get(LOGO_SOURCE_URL.format(domain=domain), timeout=5)
+        response.raise_for_status()
+        path = write_static_file(LOGO_SUBDIR, f"{domain}.png", _resize_png(response.content))
+        with _lock:
+            _logo_urls[domain] = _served_url(path)
+            _failures.pop(domain, None)
+    except Exception as e:
+        print(f"No logo for {domain}: {e}")
+        with _lock:
+            _failures[domain] = time.time()
+    finally:
+        with _lock:
+            _pending.discard(domain)
+
+
+@lru_cache(maxsize=1)
+def placeholder_logo_url() -> str:
+    """The bundled placeholder, resized and stored like a fetched logo"""
+    try:
+        with open(PLACEHOLDER_SOURCE, 'rb') as f:
+            data = _resize_png(f.read())
+    except Exception as e:
+        print(f"Error loading placeholder logo: {e}")
+        Image = lazy_import('PIL.Image')
+        buffer = io.BytesIO()
+        Image.new('RGBA', (LOGO_SIZE, LOGO_SIZE), (232, 225, 213, 255)).save(buffer, format='PNG')
+        data = buffer.getvalue()
+    try:
+        return _served_url(write_static_file(LOGO_SUBDIR, "_placeholder.png", data))
+    except OSError as e:
+        print(f"Error writing placeholder logo: {e}")
+        return data_url(data, 'png')
+
+
+def get_logo_url(source: str) -> str:
+    """
+    URL of a source's logo on our own origin. Returns the placeholder while the
+    logo is being fetched in the background or when the domain has none.
+    """
+    domain = normalize_domain(source)
+    if not domain:
+        return placeholder_logo_url()
+
+    with _lock:
+        url = _logo_urls.get(domain)
+        if url is not None:
+            return url
+        failed_at: Optional[float] = _failures.get(domain)
+        should_fetch = (domain not in _pending
+                        and (failed_at is None or time.time() - failed_at > FAILURE_RETRY_SECONDS))
+
+    # Stored by an earlier process
+    path = _logo_path(domain)
+    if os.path.exists(path):
+        url = _served_url(path)
+        with _lock:
+            _logo_urls[domain] = url
+        return url
+
+    if should_fetch:
+        with _lock:
+            if domain not in _pending:
+                _pending.add(domain)
+                _executor.submit(_fetch_logo, domain)
+    return placeholder_logo_url()
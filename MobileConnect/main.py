@@ -25,8 +25,6 @@ st.title("News Jungle")
 st.write("Welcome to the restricted News Jungle app!")
 
 import streamlit as st
-import json
-import base64
 from chat_interface import display_chat_interface # Added import statement
 
 # Page config must be the first Streamlit command
@@ -37,23 +35,28 @@ display_chat_interface()
 import pandas as pd
 from news_fetcher import fetch_news
 from bias_analyzer import analyze_bias
-from utils import format_date, clean_text, sentiment_to_emoji
+from utils import clean_text, sentiment_to_emoji
 from database import init_db, save_article, get_cached_analysis
 from image_generator import get_background_image, generate_app_logo, generate_background_image
 from news_summarizer import summarize_articles
 from chatbot import NewsAssistant
+from query_matcher import compile_query
+from article_views import articles_fingerprint, get_article_table, get_filtered_view
+from card_renderer import render_cards
+from article_index import index_articles
+from chat_history import ChatHistory
 
 # Initialize chatbot
 news_assistant = NewsAssistant()
 
 # Initialize session state for chat
 if 'chat_messages' not in st.session_state:
-    st.session_state.chat_messages = []
+    st.session_state.chat_messages = ChatHistory()
     # Add welcome message
-    st.session_state.chat_messages.append({
-        "role": "assistant",
-        "content": "Welcome to News Jungle! How can I help you explore the news today?"
-    })
+    st.session_state.chat_messages.append(
+        "assistant",
+        "Welcome to News Jungle! How can I help you explore the news today?"
+    )
 
 # Initialize filters in session state
 if 'filters' not in st.session_state:
@@ -68,7 +71,7 @@ if 'filters' not in st.session_state:
 if query := st.query_params.get("message"):
     print(f"Received message: {query}")  # Debug logging
     # Add user message to chat history
-    st.session_state.chat_messages.append({"role": "user", "content": query})
+    st.session_state.chat_messages.append("user", query)
 
     # Get chatbot response with current context
     try:
@@ -78,12 +81,12 @@ if query := st.query_params.get("message"):
         print(f"Got response: {response}")  # Debug logging
 
         # Add assistant response to chat history
-        st.session_state.chat_messages.append({"role": "assistant", "content": response})
+        st.session_state.chat_messages.append("assistant", response)
 
     except Exception as e:
         print(f"Error getting response: {e}")  # Debug logging
         error_message = "I'm having trouble responding right now. Please try again later."
-        st.session_state.chat_messages.append({"role": "assistant", "content": error_message})
+        st.session_state.chat_messages.append("assistant", error_message)
 
     # Clear the query parameter
     st.query_params.clear()
@@ -306,6 +309,14 @@ st.markdown(r"""
         word-wrap: break-word;
     }
 
+    .chat-summary {
+        align-self: stretch;
+        color: #777;
+        font-style: italic;
+        border-bottom: 1px solid #ddd;
+        padding-bottom: 8px;
+    }
+
     .assistant-message {
         align-self: flex-start;
         background: white;
@@ -382,13 +393,13 @@ if 'page' not in st.session_state:
     st.session_state.page = 'filters'
 
 # Main content area
-# Convert chat messages to JSON and encode in base64
+# Messages are rendered to HTML once, when added; the history keeps only a
+# recent window plus a summary, so the page payload stays bounded
 try:
-    chat_messages_json = json.dumps(st.session_state.chat_messages)
-    chat_messages_b64 = base64.b64encode(chat_messages_json.encode('utf-8')).decode('utf-8')
+    chat_messages_html = st.session_state.chat_messages.render_html()
 except Exception as e:
-    print(f"Error encoding chat messages: {e}")  # Debug logging
-    chat_messages_b64 = base64.b64encode(json.dumps([{"role": "assistant", "content": "Chat system is temporarily unavailable"}]).encode('utf-8')).decode('utf-8')
+    print(f"Error rendering chat messages: {e}")  # Debug logging
+    chat_messages_html = '<div class="assistant-message">Chat system is temporarily unavailable</div>'
 
 st.markdown("""
     <div class="floating-chat-container" id="chatContainer">
@@ -399,21 +410,7 @@ st.markdown("""
             <span id="toggleIcon" style="cursor: pointer;" onclick="toggleChat()">−</span>
         </div>
         <div class="chat-messages" id="chatMessages">
-            <script>
-                function loadMessages() {
-                    const messages = JSON.parse(atob('""" + chat_messages_b64 + """'));
-                    const container = document.getElementById('chatMessages');
-                    container.innerHTML = '';
-                    messages.forEach(msg => {
-                        const div = document.createElement('div');
-                        div.className = msg.role + '-message';
-                        div.textContent = msg.content;
-                        container.appendChild(div);
-                    });
-                    container.scrollTop = container.scrollHeight;
-                }
-                loadMessages();
-            </script>
+            """ + chat_messages_html + """
         </div>
         <div class="chat-input">
             <input type="text" id="chatInput" placeholder="Type your message..." />
@@ -624,6 +621,8 @@ else:
             days_ago=5,  
             source_count=50  
         )
+        # Let the chatbot answer about the articles on screen
+        index_articles(articles)
 
         if articles:
             # Generate summary for the topic
@@ -656,15 +655,10 @@ else:
 
             # If there's a search query, ignore other filters and only search
             if st.session_state.filters.get('search_query'):
-                search_terms = st.session_state.filters['search_query'].lower().split()
-                if search_terms:
-                    # Combine all terms into a single regex pattern for faster searching
-                    pattern = '|'.join(search_terms)
-                    mask = (
-                        df['title'].str.lower().str.contains(pattern, na=False) |
-                        df['content'].str.lower().str.contains(pattern, na=False)
-                    )
-                    df = df[mask]
+                matcher = compile_query(st.session_state.filters['search_query'])
+                if not matcher.match_all:
+                    # Same quoted phrase / | / implicit AND semantics as feed filtering
+                    df = df[matcher.mask(df, ['title', 'content'])]
                     # Sort search results by publication date
                     df = df.sort_values('published_at', ascending=False)
             else:
@@ -681,43 +675,29 @@ else:
                             df.at[idx, 'outlet_size'] = bias_metrics['outlet_size']
                             df.at[idx, 'political_bias'] = bias_metrics['political_bias']
 
-                    # Apply filters only if not doing a text search
-                    if st.session_state.filters['size'] != "All Sizes":
-                        size_map = {
-                            "Large Outlets": 1.0,
-                            "Medium Outlets": 0.5,
-                            "Small Outlets": 0.0
-                        }
-                        size_value = size_map[st.session_state.filters['size']]
-                        df = df[df['outlet_size'] == size_value]
-
-                    if st.session_state.filters['leaning'] != "All Views":
-                        leaning_filters = {
-                            "Left Leaning": lambda x: x < -0.2,
-                            "Center": lambda x: abs(x) <= 0.2,
-                            "Right Leaning": lambda x: x > 0.2
-                        }
-                        df = df[df['political_bias'].apply(leaning_filters[st.session_state.filters['leaning']])]
+                    # Apply filters only if not doing a text search, using typed columns.
+                    # The table and filtered view are built once per result set and shared across reruns
+                    analyzed = df.to_dict('records')
+                    fingerprint = articles_fingerprint(analyzed)
+                    indices = get_filtered_view(
+                        analyzed,
+                        fingerprint,
+                        st.session_state.filters['topic'],
+                        st.session_state.filters['size'],
+                        st.session_state.filters['leaning']
+                    )
 
                     # Sort by outlet size only when we have analyzed the articles
-                    df = df.sort_values('outlet_size', ascending=False)
-
-            # Display all articles that match the criteria
-            for _, article in df.iterrows():
-                source_domain = article['source'].split('/')[0]
-                logo_url = f"https://logo.clearbit.com/{source_domain}"
-
-                st.markdown(f"""
-                    <div class="news-card">
-                        <img src="{logo_url}" class="news-logo">
-                        <div class="news-content">
-                            <h3>{article['title']}</h3>
-                            <p>Source: {article['source']} | Published: {format_date(article['published_at'])}</p>
-                            <p>Topic: {st.session_state.filters['topic']}</p>
-                            <a href="{article['url']}" target="_blank">Read More</a>
-                        </div>
-                    </div>
-                """, unsafe_allow_html=True)
+                    indices = get_article_table(analyzed, fingerprint).sort_indices(indices, 'size_tier', descending=True)
+                    df = df.iloc[indices]
+
+            # Display all articles that match the criteria in one markdown call;
+            # cards are cached per URL, so reruns only re-emit HTML
+            st.markdown(
+                render_cards(df.to_dict('records'), template='compact',
+                             topic=st.session_state.filters['topic']),
+                unsafe_allow_html=True
+            )
 
             if len(df) == 0:
                 st.warning("No articles found matching your criteria. Try adjusting your filters.")
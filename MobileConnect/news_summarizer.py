@@ -1,17 +1,16 @@
 import os
-import nltk
-from openai import OpenAI
 from typing import List, Dict, Any
 import psycopg2
 from datetime import datetime, timedelta
-from nltk.tokenize import sent_tokenize
 from hashlib import md5
 import json
+from single_flight import coalesced_create
+from services import get_openai_client
+from metrics import record_cache, stage_timer
 
 # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
 # do not change this unless explicitly requested by the user
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-openai = OpenAI(api_key=OPENAI_API_KEY)
 
 def get_cached_summary(cache_key: str) -> str:
     """Get a cached summary if available and not expired"""
@@ -127,6 +126,7 @@ def summarize_articles(articles: List[Dict[str, Any]], topic: str) -> dict:
 
     # Try to get cached summary
     cached_summary = get_cached_summary(cache_key)
+    record_cache('summary', bool(cached_summary))
     if cached_summary:
         return json.loads(cached_summary)
 
@@ -159,13 +159,15 @@ Requirements:
 5. For each point, specify which article (0-4) best represents that point
 """
 
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            max_tokens=200,
-            temperature=0.7
-        )
+        with stage_timer('summary'):
+            response = coalesced_create(
+                get_openai_client().chat.completions.create,
+                model="gpt-4o",
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                max_tokens=200,
+                temperature=0.7
+            )
 
         result = json.loads(response.choices[0].message.content)
 
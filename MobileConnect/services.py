@@ -0,0 +1,86 @@
+import importlib
+import os
+import threading
+from typing import Any, Callable, Dict
+
+# Name -> factory. Factories run once, on first use, and may return None when
+# a service is not configured (e.g. a missing API key).
+_factories: Dict[str, Callable[[], Any]] = {}
+_instances: Dict[str, Any] = {}
+_lock = threading.RLock()
+
+
+def register_service(name: str, factory: Callable[[], Any]):
+    """Register (or replace) the factory for a service"""
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+
+def get_service(name: str) -> Any:
+    """Get a service, creating it on first use"""
+    with _lock:
+        if name not in _instances:
+            _instances[name] = _factories[name]()
+        return _instances[name]
+
+
+def override_service(name: str, instance: Any):
+    """Use a ready-made instance for a service, e.g. a stub client in benchmarks"""
+    with _lock:
+        _instances[name] = instance
+
+
+def reset_services():
+    """Forget created instances so the next use rebuilds them"""
+    with _lock:
+        _instances.clear()
+
+
+def lazy_import(module_name: str):
+    """Import a heavy module on first use instead of at application start"""
+    return importlib.import_module(module_name)
+
+
+def _create_openai_client():
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        print("Warning: OPENAI_API_KEY not found in environment variables")
+        return None
+    try:
+        return lazy_import("openai").OpenAI(api_key=api_key)
+    except Exception as e:
+        print(f"Error initializing OpenAI client: {e}")
+        return None
+
+
+def _create_anthropic_client():
+    return lazy_import("anthropic").Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+
+
+def _create_search_agent():
+    try:
+        return lazy_import("search_agent").SearchAgent()
+    except Exception as e:
+        print(f"Failed to initialize search agent: {e}")
+        return None
+
+
+register_service("openai", _create_openai_client)
+register_service("anthropic", _create_anthropic_client)
+register_service("search_agent", _create_search_agent)
+
+
+def get_openai_client():
+    """Shared OpenAI client, or None without OPENAI_API_KEY"""
+    return get_service("openai")
+
+
+def get_anthropic_client():
+    """Shared Anthropic client"""
+    return get_service("anthropic")
+
+
+def get_search_agent():
+    """Shared SearchAgent, or None if it could not be created"""
+    return get_service("search_agent")
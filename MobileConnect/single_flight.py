@@ -0,0 +1,62 @@
+import json
+import threading
+from concurrent.futures import Future
+from hashlib import sha256
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers arriving
+    while it is in flight wait on the leader's future and get the same result
+    or exception instead of running the function themselves.
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._calls)
+
+
+def prompt_fingerprint(request: Dict[str, Any]) -> str:
+    """Stable hash of an LLM request (model, messages and parameters)"""
+    data = json.dumps(request, sort_keys=True, default=str)
+    return sha256(data.encode()).hexdigest()
+
+
+# Shared by every LLM call site so identical requests in flight are sent once
+llm_requests = SingleFlight()
+
+
+def coalesced_create(create: Callable[..., Any], **request) -> Any:
+    """Call an LLM client's create method, sharing the response with any identical request already in flight"""
+    key = prompt_fingerprint({'endpoint': getattr(create, '__qualname__', repr(create)), **request})
+    return llm_requests.do(key, create, **request)
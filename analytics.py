@@ -3,11 +3,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime, timedelta
-from database import get_db_connection
+from database import bias_bucket_center
+from analytics_data import AnalyticsWindow, PRESET_WINDOWS, ROLLUP_FIELDS, load_analytics_rows
+
+# Charts take rollup rows: day, source, sentiment, bias_bucket, article_count
 
 def get_sentiment_distribution(df):
     """Calculate sentiment distribution from articles"""
-    sentiment_counts = df['sentiment'].value_counts()
+    sentiment_counts = df.groupby('sentiment')['article_count'].sum()
     fig = px.pie(
         values=sentiment_counts.values,
         names=sentiment_counts.index,
@@ -17,7 +20,7 @@ def get_sentiment_distribution(df):
 
 def get_source_diversity(df):
     """Create source diversity visualization"""
-    source_counts = df['source'].value_counts().head(10)
+    source_counts = df.groupby('source')['article_count'].sum().nlargest(10)
     fig = px.bar(
         x=source_counts.index,
         y=source_counts.values,
@@ -29,11 +32,10 @@ def get_source_diversity(df):
 
 def get_topic_trends(df):
     """Visualize topic trends over time"""
-    df['date'] = pd.to_datetime(df['published_at']).dt.date
-    daily_counts = df.groupby('date').size().reset_index(name='count')
+    daily_counts = df.groupby('day')['article_count'].sum().reset_index(name='count')
     fig = px.line(
         daily_counts,
-        x='date',
+        x='day',
         y='count',
         title='Article Volume Over Time'
     )
@@ -41,28 +43,49 @@ def get_topic_trends(df):
 
 def get_bias_distribution(df):
     """Visualize bias score distribution"""
-    fig = px.histogram(
-        df,
-        x='bias_score',
-        nbins=20,
+    scored = df[df['bias_bucket'] >= 0]
+    bucket_counts = scored.groupby('bias_bucket')['article_count'].sum()
+    fig = px.bar(
+        x=[bias_bucket_center(bucket) for bucket in bucket_counts.index],
+        y=bucket_counts.values,
         title='Distribution of Political Bias Scores',
-        labels={'bias_score': 'Bias Score (-1: Left, 0: Center, 1: Right)'}
+        labels={'x': 'Bias Score (-1: Left, 0: Center, 1: Right)', 'y': 'count'}
     )
+    fig.update_layout(bargap=0)
     return fig
 
+def select_window() -> AnalyticsWindow:
+    """Time window picker: presets or a custom date range"""
+    choice = st.radio("Time window", list(PRESET_WINDOWS) + ["Custom"], index=1, horizontal=True)
+    if choice != "Custom":
+        return PRESET_WINDOWS[choice]
+
+    today = datetime.now().date()
+    selected = st.date_input("Date range", (today - timedelta(days=7), today), max_value=today)
+    # The picker returns a single date until the end of the range is chosen
+    start, end = (selected[0], selected[-1]) if selected else (today, today)
+    return AnalyticsWindow(start=start, end=end)
+
 def display_analytics_dashboard():
     """Display the analytics dashboard"""
     st.title("News Analytics Dashboard")
-    
-    # Get data from database
-    conn = get_db_connection()
-    query = """
-        SELECT title, content, source, published_at, bias_score, sentiment
-        FROM articles
-        WHERE published_at >= NOW() - INTERVAL '7 days'
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+
+    window = select_window()
+    # Pre-aggregated counts (a few hundred rows, no article text), cached until the next ingest
+    window_rows = load_analytics_rows(window)
+    sources = sorted({row['source'] for row in window_rows})
+
+    col1, col2 = st.columns(2)
+    with col1:
+        source = st.selectbox("Source", ["All Sources"] + sources)
+    with col2:
+        topic = st.text_input("Topic", placeholder="e.g. election | senate").strip()
+
+    if source == "All Sources" and not topic:
+        rows = window_rows
+    else:
+        rows = load_analytics_rows(window, None if source == "All Sources" else source, topic)
+    df = pd.DataFrame(rows, columns=list(ROLLUP_FIELDS))
     
     if len(df) == 0:
         st.warning("No data available for analysis in the selected time period.")
@@ -85,9 +108,10 @@ def display_analytics_dashboard():
     
     # Summary statistics
     st.subheader("Summary Statistics")
+    source_totals = df.groupby('source')['article_count'].sum()
     st.markdown(f"""
-    - Total Articles: {len(df)}
+    - Total Articles: {df['article_count'].sum()}
     - Unique Sources: {df['source'].nunique()}
-    - Date Range: {df['published_at'].min().date()} to {df['published_at'].max().date()}
-    - Most Common Source: {df['source'].mode().iloc[0]}
+    - Date Range: {df['day'].min()} to {df['day'].max()}
+    - Most Common Source: {source_totals.idxmax()}
     """)
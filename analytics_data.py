@@ -0,0 +1,182 @@
+"""
+Data access for the analytics dashboard.
+
+Charts consume rollup rows (day, source, sentiment, bias_bucket, article_count)
+for a time window, optionally drilled down to one source or topic:
+
+- Day-aligned windows (7d, 30d, custom date ranges), whole or per source, are
+  read from the article_rollups table, so a 30-day view costs about as much as a
+  7-day one.
+- Rolling windows (24h), topic drill-downs, and any query the rollups can't serve
+  stream the articles table instead. Only the four charted columns are selected,
+  rows arrive in chunks through a server-side cursor, and each chunk is folded
+  into running counts, so memory depends on the number of distinct keys rather
+  than on the number of articles.
+
+Results are cached per (window, source, topic, data version). The version
+changes with every committed article insert, delete or update of a charted,
+timestamp or title column, and with every rollup rebuild, so cached figures
+never outlive an ingest.
+"""
+from datetime import date
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import streamlit as st
+from psycopg2.extras import RealDictCursor
+
+from database import bias_bucket, get_data_version, get_db_connection
+from metrics import stage_timer
+from query_matcher import compile_query
+
+ROLLUP_FIELDS = ('day', 'source', 'sentiment', 'bias_bucket', 'article_count')
+
+# Columns the charts need; content and title are never read
+ANALYTICS_COLUMNS = ('published_at', 'source', 'sentiment', 'bias_score')
+
+CHUNK_SIZE = 5000  # Rows per round trip from the server-side cursor
+
+
+class AnalyticsWindow(NamedTuple):
+    """A time window: the last `hours` hours, the last `days` days (from midnight), or start..end inclusive"""
+    hours: Optional[int] = None
+    days: Optional[int] = None
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+    @property
+    def day_aligned(self) -> bool:
+        """Whether the window covers whole days, so the daily rollups can answer it"""
+        return self.hours is None
+
+    def sql_condition(self, column: str) -> Tuple[str, List[Any]]:
+        """SQL condition restricting a timestamp or date column to the window"""
+        if self.hours is not None:
+            return f"{column} >= NOW() - make_interval(hours => %s)", [self.hours]
+        if self.days is not None:
+            return f"{column} >= (NOW() - make_interval(days => %s))::date", [self.days]
+        return f"{column} >= %s AND {column} < %s::date + 1", [self.start, self.end]
+
+
+PRESET_WINDOWS = {
+    'Last 24 hours': AnalyticsWindow(hours=24),
+    'Last 7 days': AnalyticsWindow(days=7),
+    'Last 30 days': AnalyticsWindow(days=30),
+}
+
+
+class RunningAggregates:
+    """Article counts per rollup key, built up one chunk at a time"""
+    def __init__(self):
+        self.counts: Dict[Tuple[Any, str, str, int], int] = {}
+        self.rows_seen = 0
+
+    def add_chunk(self, rows: Sequence[Tuple]):
+        """Fold (published_at, source, sentiment, bias_score) rows into the counts"""
+        counts = self.counts
+        for published_at, source, sentiment, bias_score in rows:
+            key = (published_at.date(), source, sentiment or 'unknown', bias_bucket(bias_score))
+            counts[key] = counts.get(key, 0) + 1
+        self.rows_seen += len(rows)
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Counts in the same shape as article_rollups rows"""
+        return [dict(zip(ROLLUP_FIELDS, key + (count,))) for key, count in self.counts.items()]
+
+
+def stream_article_chunks(window: AnalyticsWindow, where: str = "", params: Sequence = (),
+                          chunk_size: int = CHUNK_SIZE) -> Iterator[List[Tuple]]:
+    """
+    Yield chunks of analytics columns for articles in the window.
+    `where` adds SQL conditions (joined with AND) using `params`.
+    """
+    window_clause, window_params = window.sql_condition('published_at')
+    conn = get_db_connection()
+    try:
+        # A named cursor keeps the result set on the server; rows are fetched chunk by chunk
+        with conn.cursor(name='analytics_stream') as cur:
+            cur.itersize = chunk_size
+            cur.execute(f'''
+                SELECT {', '.join(ANALYTICS_COLUMNS)}
+                FROM articles
+                WHERE {window_clause}
+                {f'AND {where}' if where else ''}
+            ''', [*window_params, *params])
+            while True:
+                chunk = cur.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        conn.close()
+
+
+def aggregate_articles(window: AnalyticsWindow, where: str = "", params: Sequence = (),
+                       chunk_size: int = CHUNK_SIZE) -> List[Dict[str, Any]]:
+    """Rollup rows computed by streaming the articles table"""
+    aggregates = RunningAggregates()
+    with stage_timer('db_query', query='analytics_stream'):
+        for chunk in stream_article_chunks(window, where, params, chunk_size):
+            aggregates.add_chunk(chunk)
+    return aggregates.to_rows()
+
+
+def read_rollups(window: AnalyticsWindow, source: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Rollup rows for a day-aligned window, optionally for one source"""
+    window_clause, params = window.sql_condition('day')
+    query = f'''
+        SELECT day, source, sentiment, bias_bucket, article_count
+        FROM article_rollups
+        WHERE {window_clause} AND article_count > 0
+    '''
+    if source:
+        query += ' AND source = %s'
+        params.append(source)
+
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        with stage_timer('db_query', query='article_rollups'):
+            cur.execute(query, params)
+            return cur.fetchall()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def query_analytics_rows(window: AnalyticsWindow, source: Optional[str] = None,
+                         topic: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Rollup rows for a window and drill-down, from the rollups when possible"""
+    if window.day_aligned and not topic:
+        try:
+            return read_rollups(window, source)
+        except Exception as e:
+            print(f"Article rollups unavailable, aggregating from articles: {e}")
+
+    conditions, params = [], []
+    if source:
+        conditions.append('source = %s')
+        params.append(source)
+    if topic:
+        # Same quoted phrase / | / implicit AND semantics as the search box
+        topic_clause, topic_params = compile_query(topic).sql_clause(['title'])
+        conditions.append(topic_clause)
+        params.extend(topic_params)
+    return aggregate_articles(window, ' AND '.join(conditions), params)
+
+
+@st.cache_data(ttl=900, max_entries=128, show_spinner=False)
+def _cached_analytics_rows(window: AnalyticsWindow, source: Optional[str], topic: Optional[str],
+                           version: int) -> List[Dict[str, Any]]:
+    # version is only part of the cache key
+    return query_analytics_rows(window, source, topic)
+
+
+def load_analytics_rows(window: AnalyticsWindow = PRESET_WINDOWS['Last 7 days'],
+                        source: Optional[str] = None, topic: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Cached rollup rows for a window and drill-down; recomputed after new articles are saved"""
+    try:
+        version = get_data_version()
+    except Exception as e:
+        print(f"Could not read the analytics data version: {e}")
+        return query_analytics_rows(window, source, topic or None)
+    return _cached_analytics_rows(window, source, topic or None, version)
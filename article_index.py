@@ -0,0 +1,193 @@
+"""
+Local BM25 index over fetched and stored articles, used to ground chatbot answers.
+
+Articles are added as the app fetches them, and on the first chat turn the
+recent ones in the articles table are loaded behind them. For a chat message
+the best-matching articles are turned into short snippets, added until a fixed
+token budget is reached, so the prompt size per turn stays bounded however many
+articles are indexed.
+"""
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+MAX_INDEXED_ARTICLES = 5000  # Oldest articles are dropped beyond this
+CONTEXT_TOKEN_BUDGET = 600  # Tokens of article context per chat turn
+CHARS_PER_TOKEN = 4  # Rough estimate for English text
+SNIPPET_CHARS = 400
+STORED_ARTICLE_DAYS = 7
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his i in is it its of on or
+our she that the their them they this to was we were what when where which who
+will with you your about how news article articles tell me any there
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall((text or '').lower()) if t not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def best_snippet(content: str, terms: Iterable[str], max_chars: int = SNIPPET_CHARS) -> str:
+    """The run of sentences, starting at the one with most query terms, that fits in max_chars"""
+    sentences = [s for s in SENTENCE_PATTERN.split((content or '').strip()) if s]
+    if not sentences:
+        return ''
+    terms = set(terms)
+    best = max(range(len(sentences)), key=lambda i: len(terms.intersection(tokenize(sentences[i]))))
+
+    snippet = ''
+    for sentence in sentences[best:]:
+        candidate = f"{snippet} {sentence}".strip()
+        if len(candidate) > max_chars:
+            break
+        snippet = candidate
+    return snippet or sentences[best][:max_chars].rsplit(' ', 1)[0] + '...'
+
+
+class ArticleIndex:
+    """Incremental BM25 index keyed by article URL"""
+    def __init__(self, max_articles: int = MAX_INDEXED_ARTICLES):
+        self.max_articles = max_articles
+        self.articles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # url -> article
+        self.term_counts: Dict[str, Counter] = {}  # url -> term frequencies
+        self.doc_lengths: Dict[str, int] = {}  # url -> number of terms
+        self.postings: Dict[str, Dict[str, int]] = {}  # term -> {url: term frequency}
+        self.total_length = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def _remove(self, url: str):
+        self.articles.pop(url)
+        counts = self.term_counts.pop(url)
+        self.total_length -= self.doc_lengths.pop(url)
+        for term in counts:
+            docs = self.postings[term]
+            del docs[url]
+            if not docs:
+                del self.postings[term]
+
+    def _add(self, url: str, article: Dict[str, Any]):
+        # Titles carry the most signal, so they count twice
+        counts = Counter(tokenize(f"{article.get('title', '')} " * 2 + str(article.get('content') or '')))
+        self.articles[url] = {key: article.get(key) for key in ('title', 'source', 'url', 'published_at', 'content')}
+        self.term_counts[url] = counts
+        self.doc_lengths[url] = length = sum(counts.values())
+        self.total_length += length
+        for term, frequency in counts.items():
+            self.postings.setdefault(term, {})[url] = frequency
+
+    def _evict(self):
+        while len(self.articles) > self.max_articles:
+            self._remove(next(iter(self.articles)))
+
+    def add_articles(self, articles: Iterable[Dict[str, Any]]):
+        """Index articles as the newest, replacing earlier versions of the same URL"""
+        with self.lock:
+            for article in articles:
+                url = article.get('url')
+                if not url:
+                    continue
+                if url in self.articles:
+                    self._remove(url)
+                self._add(url, article)
+            self._evict()
+
+    def add_older_articles(self, articles: Sequence[Dict[str, Any]]):
+        """
+        Index articles (oldest first) as older than everything already indexed,
+        so they are evicted first. URLs already indexed are kept as they are.
+        """
+        with self.lock:
+            for article in reversed(articles):
+                url = article.get('url')
+                if not url or url in self.articles:
+                    continue
+                self._add(url, article)
+                self.articles.move_to_end(url, last=False)
+            self._evict()
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-k articles by BM25 score"""
+        terms = set(tokenize(query))
+        with self.lock:
+            count = len(self.articles)
+            if not terms or not count:
+                return []
+            average_length = self.total_length / count
+            scores: Dict[str, float] = {}
+            for term in terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+                for url, frequency in docs.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[url] / average_length)
+                    scores[url] = scores.get(url, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            top = sorted(scores.items(), key=lambda item: -item[1])[:k]
+            return [(score, self.articles[url]) for url, score in top]
+
+    def build_context(self, query: str, k: int = 5, token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+        """Snippets of the best-matching articles, within the token budget"""
+        terms = tokenize(query)
+        lines = []
+        used = 0
+        for _, article in self.search(query, k):
+            snippet = best_snippet(article.get('content') or '', terms)
+            line = (f"[{len(lines) + 1}] {article.get('title', '')} ({article.get('source', '')}, "
+                    f"{str(article.get('published_at') or '')[:10]})\n{snippet}\n{article.get('url', '')}")
+            cost = estimate_tokens(line)
+            if used + cost > token_budget:
+                break
+            lines.append(line)
+            used += cost
+        return '\n\n'.join(lines)
+
+
+_index = ArticleIndex()
+_seeded = False
+_seed_lock = threading.Lock()
+
+
+def get_article_index() -> ArticleIndex:
+    """The process-wide index of fetched articles"""
+    return _index
+
+
+def get_seeded_article_index() -> ArticleIndex:
+    """
+    The process-wide index, with recently stored articles loaded on first use.
+    Called from the chat path only, so a slow or unreachable database never
+    holds up a news fetch.
+    """
+    global _seeded
+    if not _seeded:
+        with _seed_lock:
+            if not _seeded:
+                try:
+                    from database import get_recent_articles
+                    _index.add_older_articles(get_recent_articles(days=STORED_ARTICLE_DAYS, limit=MAX_INDEXED_ARTICLES))
+                except Exception as e:
+                    print(f"Stored articles not indexed: {e}")
+                _seeded = True
+    return _index
+
+
+def index_articles(articles: Iterable[Dict[str, Any]]):
+    """Make fetched articles available to the chatbot"""
+    try:
+        _index.add_articles(articles)
+    except Exception as e:
+        print(f"Error indexing articles: {e}")
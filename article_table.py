@@ -0,0 +1,164 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from date_parser import parse_date
+
+# Outlet size values from bias_analyzer.get_outlet_size mapped to compact tiers
+SIZE_TIERS = {1.0: 2, 0.5: 1, 0.0: 0}
+UNKNOWN_TIER = -1
+
+SIZE_LABEL_TIERS = {
+    "Large Outlets": 2,
+    "Medium Outlets": 1,
+    "Small Outlets": 0
+}
+
+LEANING_THRESHOLD = 0.2
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_datetime64(value: Any) -> np.datetime64:
+    parsed = parse_date(value) if isinstance(value, str) else None
+    if parsed is None:
+        return np.datetime64('NaT', 's')
+    # Stored as naive UTC seconds
+    return np.datetime64(int(parsed.timestamp()), 's')
+
+
+def _code_dtype(category_count: int):
+    """Smallest signed integer type that holds codes 0..category_count-1"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if category_count <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.int64
+
+
+def _categorize(values: Sequence[Any]) -> tuple:
+    """Dictionary-encode values into integer codes and a list of categories"""
+    categories: List[str] = []
+    lookup: Dict[str, int] = {}
+    codes = np.empty(len(values), dtype=np.int64)
+    for i, value in enumerate(values):
+        key = '' if value is None else str(value)
+        code = lookup.get(key)
+        if code is None:
+            code = lookup[key] = len(categories)
+            categories.append(key)
+        codes[i] = code
+    return codes.astype(_code_dtype(len(categories))), categories
+
+
+class ArticleTable:
+    """
+    Typed columnar view of a result set for fast filtering and sorting.
+
+    Rows line up with the article list the table was built from, so the index
+    arrays returned by the filter and sort methods can be used to pick articles.
+    """
+    def __init__(self, political_bias: np.ndarray, bias_score: np.ndarray, size_tier: np.ndarray,
+                 source_codes: np.ndarray, sources: List[str],
+                 sentiment_codes: np.ndarray, sentiments: List[str],
+                 published_at: np.ndarray):
+        self.political_bias = political_bias
+        self.bias_score = bias_score
+        self.size_tier = size_tier
+        self.source_codes = source_codes
+        self.sources = sources
+        self.sentiment_codes = sentiment_codes
+        self.sentiments = sentiments
+        self.published_at = published_at
+
+    def __len__(self) -> int:
+        return len(self.size_tier)
+
+    @classmethod
+    def from_columns(cls, political_bias: Sequence[Any], bias_score: Sequence[Any], outlet_size: Sequence[Any],
+                     source: Sequence[Any], sentiment: Sequence[Any], published_at: Sequence[Any]) -> "ArticleTable":
+        source_codes, sources = _categorize(source)
+        sentiment_codes, sentiments = _categorize(sentiment)
+        return cls(
+            political_bias=np.fromiter((_to_float(v) for v in political_bias), dtype=np.float32, count=len(political_bias)),
+            bias_score=np.fromiter((_to_float(v) for v in bias_score), dtype=np.float32, count=len(bias_score)),
+            size_tier=np.fromiter((SIZE_TIERS.get(_to_float(v), UNKNOWN_TIER) for v in outlet_size),
+                                  dtype=np.int8, count=len(outlet_size)),
+            source_codes=source_codes,
+            sources=sources,
+            sentiment_codes=sentiment_codes,
+            sentiments=sentiments,
+            published_at=np.array([_to_datetime64(v) for v in published_at], dtype='datetime64[s]')
+        )
+
+    @classmethod
+    def from_articles(cls, articles: Iterable[Dict[str, Any]]) -> "ArticleTable":
+        articles = list(articles)
+        return cls.from_columns(
+            political_bias=[a.get('political_bias') for a in articles],
+            bias_score=[a.get('bias_score') for a in articles],
+            outlet_size=[a.get('outlet_size') for a in articles],
+            source=[a.get('source') for a in articles],
+            sentiment=[a.get('sentiment') for a in articles],
+            published_at=[a.get('published_at') for a in articles]
+        )
+
+    @classmethod
+    def from_frame(cls, df) -> "ArticleTable":
+        """Build from a DataFrame of articles; missing columns become empty values"""
+        def column(name):
+            return df[name].tolist() if name in df.columns else [None] * len(df)
+
+        return cls.from_columns(
+            political_bias=column('political_bias'),
+            bias_score=column('bias_score'),
+            outlet_size=column('outlet_size'),
+            source=column('source'),
+            sentiment=column('sentiment'),
+            published_at=column('published_at')
+        )
+
+    def size_mask(self, size: str) -> np.ndarray:
+        """Rows from outlets of the selected size ("All Sizes" matches everything)"""
+        if size == "All Sizes":
+            return np.ones(len(self), dtype=bool)
+        return self.size_tier == SIZE_LABEL_TIERS[size]
+
+    def leaning_mask(self, leaning: str) -> np.ndarray:
+        """Rows with the selected political leaning; missing bias counts as center"""
+        if leaning == "All Views":
+            return np.ones(len(self), dtype=bool)
+        bias = np.nan_to_num(self.political_bias, nan=0.0)
+        if leaning == "Left Leaning":
+            return bias < -LEANING_THRESHOLD
+        if leaning == "Right Leaning":
+            return bias > LEANING_THRESHOLD
+        if leaning == "Center":
+            return np.abs(bias) <= LEANING_THRESHOLD
+        raise KeyError(leaning)
+
+    def filter_indices(self, size: str = "All Sizes", leaning: str = "All Views") -> np.ndarray:
+        """Row indices passing both filters, in original order"""
+        return np.flatnonzero(self.size_mask(size) & self.leaning_mask(leaning))
+
+    def sort_indices(self, indices: np.ndarray, column: str, descending: bool = True) -> np.ndarray:
+        """Stable sort of the given row indices by a numeric or datetime column"""
+        values = getattr(self, column)[indices]
+        if np.issubdtype(values.dtype, np.datetime64):
+            values = values.astype(np.int64)
+            # NaT sorts as the oldest value
+            values = np.where(values == np.iinfo(np.int64).min, np.iinfo(np.int64).min + 1, values)
+        if descending:
+            values = -values.astype(np.float64)
+        order = np.argsort(values, kind='stable')
+        return indices[order]
+
+    def source_counts(self, indices: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """Number of rows per source, for the given rows or all of them"""
+        codes = self.source_codes if indices is None else self.source_codes[indices]
+        counts = np.bincount(codes, minlength=len(self.sources))
+        return {self.sources[i]: int(c) for i, c in enumerate(counts) if c}
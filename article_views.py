@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from hashlib import md5
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from article_table import ArticleTable
+from metrics import record_cache
+
+VIEW_CACHE_SIZE = 256  # Filtered views kept across all sessions
+TABLE_CACHE_SIZE = 64  # Columnar tables kept, one per distinct result set
+
+# (articles fingerprint, query, size, leaning) -> indices of matching articles
+_views: "OrderedDict[Tuple[str, str, str, str], np.ndarray]" = OrderedDict()
+# articles fingerprint -> typed columnar table of the result set
+_tables: "OrderedDict[str, ArticleTable]" = OrderedDict()
+_views_lock = threading.Lock()
+
+
+def articles_fingerprint(articles: List[Dict[str, Any]]) -> str:
+    """Identify a result set by the fields the filters use so sessions with the same results share views"""
+    digest = md5()
+    for article in articles:
+        for field in ('url', 'outlet_size', 'political_bias'):
+            digest.update(str(article.get(field, '')).encode())
+            digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def get_article_table(articles: List[Dict[str, Any]], fingerprint: str) -> ArticleTable:
+    """Get the columnar table for a result set, building it once per fingerprint"""
+    with _views_lock:
+        table = _tables.get(fingerprint)
+        if table is not None:
+            _tables.move_to_end(fingerprint)
+            return table
+
+    table = ArticleTable.from_articles(articles)
+
+    with _views_lock:
+        _tables[fingerprint] = table
+        while len(_tables) > TABLE_CACHE_SIZE:
+            _tables.popitem(last=False)
+    return table
+
+
+def get_filtered_view(articles: List[Dict[str, Any]], fingerprint: str,
+                      query: str, size: str, leaning: str) -> np.ndarray:
+    """Get the cached index of articles matching the filters, building it on first use"""
+    key = (fingerprint, query, size, leaning)
+    with _views_lock:
+        view = _views.get(key)
+        record_cache('article_views', view is not None)
+        if view is not None:
+            _views.move_to_end(key)
+            return view
+
+    view = get_article_table(articles, fingerprint).filter_indices(size, leaning)
+
+    with _views_lock:
+        _views[key] = view
+        while len(_views) > VIEW_CACHE_SIZE:
+            _views.popitem(last=False)
+    return view
+
+
+def get_paginated_view(articles: List[Dict[str, Any]], fingerprint: str,
+                       filters: Dict[str, str], page: int, per_page: int) -> Dict[str, Any]:
+    """Slice one page out of the cached filtered view"""
+    view = get_filtered_view(articles, fingerprint, filters['topic'],
+                             filters.get('size', "All Sizes"), filters.get('leaning', "All Views"))
+
+    total_articles = len(view)
+    start_index = (page - 1) * per_page
+    end_index = min(start_index + per_page, total_articles)
+
+    return {
+        'articles': [articles[i] for i in view[start_index:end_index]],
+        'total': total_articles,
+        'current_page': page,
+        'pages': (total_articles + per_page - 1) // per_page
+    }
@@ -0,0 +1,296 @@
+"""
+Recorded upstream responses for offline benchmarks, and a local server that replays them.
+
+A fixture set maps each upstream URL (host and path, query string ignored) to the
+response body that was recorded for one search query. Sets are stored as one
+gzipped JSON file:
+
+    python benchmarks/fixtures.py record "climate change" --days 7 -o benchmarks/fixtures/climate.json.gz
+
+Recording needs network access once. Without a recorded set, the benchmarks use a
+synthetic set generated deterministically from a seed, shaped like the real feeds,
+APIs and article pages.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+GDELT_URL = "https://api.gdeltproject.org/api/v2/doc/doc"
+GOOGLE_URL = "https://www.googleapis.com/customsearch/v1"
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+WORDS = (
+    "government officials report new policy markets analysts say economy growth season "
+    "team coach players league match record fans election voters campaign senate court "
+    "ruling investigation scientists study health hospital patients climate energy prices "
+    "company shares investors technology launch users security agreement talks leaders"
+).split()
+
+
+def url_key(url: str) -> str:
+    """Fixture key of a URL: host and path, without scheme or query string"""
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+class FixtureSet:
+    """Upstream responses recorded for one query"""
+    def __init__(self, query: str, days: int, responses: Dict[str, Dict],
+                 recorded_at: Optional[str] = None):
+        self.query = query
+        self.days = days
+        self.responses = responses  # url key -> {status, content_type, body}
+        self.recorded_at = recorded_at
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        return self.responses.get(url_key(url))
+
+    def add(self, url: str, body: str, content_type: str, status: int = 200):
+        self.responses[url_key(url)] = {'status': status, 'content_type': content_type, 'body': body}
+
+    def replay_days(self) -> int:
+        """Days to request so recorded items are still inside the pipeline's date cutoff"""
+        if not self.recorded_at:
+            return self.days
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(self.recorded_at)
+        return self.days + age.days + 1
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = {'query': self.query, 'days': self.days, 'recorded_at': self.recorded_at,
+                'responses': self.responses}
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'FixtureSet':
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['query'], data['days'], data['responses'], data.get('recorded_at'))
+
+
+def _sentence(rng: random.Random, query: str, mention: bool) -> str:
+    words = rng.sample(WORDS, rng.randint(8, 16))
+    if mention:
+        words.insert(rng.randrange(len(words)), query)
+    return ' '.join(words).capitalize() + '.'
+
+
+def _article_html(rng: random.Random, title: str, query: str, paragraphs: int) -> str:
+    body = '\n'.join(
+        f"<p>{escape(' '.join(_sentence(rng, query, rng.random() < 0.3) for _ in range(rng.randint(3, 6))))}</p>"
+        for _ in range(paragraphs)
+    )
+    return (f"<!DOCTYPE html><html><head><title>{escape(title)}</title></head><body>"
+            f"<nav><a href='/'>Home</a> <a href='/news'>News</a></nav>"
+            f"<article><h1>{escape(title)}</h1>{body}</article>"
+            f"<footer>Copyright</footer></body></html>")
+
+
+def synthesize(query: str = "election", days: int = 7, seed: int = 42,
+               items_per_feed: int = 30, api_results: int = 50,
+               paragraphs: int = 8) -> FixtureSet:
+    """
+    Generate a fixture set for every upstream the app queries, dated relative to now.
+    About half of the feed items mention the query, so relevance filtering has work to do.
+    """
+    from news_sources import get_news_sources
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    fixtures = FixtureSet(query, days, {})
+
+    feed_urls = []
+    for source in get_news_sources():
+        feed_urls.extend(getattr(source, 'feed_urls', []))
+
+    for feed_url in feed_urls:
+        host = urlsplit(feed_url).netloc
+        items = []
+        for i in range(items_per_feed):
+            mention = rng.random() < 0.5
+            title = _sentence(rng, query, mention).rstrip('.')
+            link = f"https://{host}/articles/{seed}-{i}"
+            published = now - timedelta(hours=i * days * 48 / items_per_feed)  # Half the items fall outside the window
+            items.append(
+                f"<item><title>{escape(title)}</title><link>{link}</link>"
+                f"<pubDate>{format_datetime(published)}</pubDate>"
+                f"<description>{escape(_sentence(rng, query, mention))}</description></item>"
+            )
+            fixtures.add(link, _article_html(rng, title, query, paragraphs), 'text/html')
+        fixtures.add(feed_url, f'<?xml version="1.0"?><rss version="2.0"><channel><title>{host}</title>'
+                               f'{"".join(items)}</channel></rss>', 'application/rss+xml')
+
+    gdelt_articles = []
+    google_items = []
+    for i in range(api_results):
+        domain = rng.choice(['cnn.com', 'foxnews.com', 'reuters.com', 'npr.org', 'nytimes.com', 'bbc.co.uk'])
+        title = _sentence(rng, query, True).rstrip('.')
+        url = f"https://www.{domain}/story/{seed}-{i}"
+        seen = now - timedelta(hours=rng.uniform(0, days * 24))
+        gdelt_articles.append({'url': url, 'title': title, 'domain': domain,
+                               'seendate': seen.strftime('%Y%m%dT%H%M%SZ'),
+                               'excerpt': _sentence(rng, query, True)})
+        if i < 10:  # The Google source asks for 10 results
+            google_items.append({'title': title, 'link': url, 'displayLink': f"www.{domain}",
+                                 'snippet': _sentence(rng, query, True)})
+        fixtures.add(url, _article_html(rng, title, query, paragraphs), 'text/html')
+
+    fixtures.add(GDELT_URL, json.dumps({'articles': gdelt_articles}), 'application/json')
+    fixtures.add(GOOGLE_URL, json.dumps({'items': google_items}), 'application/json')
+    return fixtures
+
+
+def record(query: str, days: int, google_key: Optional[str] = None,
+           google_cx: Optional[str] = None) -> FixtureSet:
+    """Fetch every upstream for a query, plus the article pages they link to, and keep the responses"""
+    import requests
+    from feed_parser import iter_feed_items
+    from news_sources import get_news_sources
+
+    fixtures = FixtureSet(query, days, {}, datetime.now(timezone.utc).isoformat())
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    article_urls = []
+
+    def keep(url, params=None) -> Optional[requests.Response]:
+        try:
+            response = session.get(url, params=params, timeout=15)
+        except requests.RequestException as e:
+            print(f"Skipped {url}: {e}")
+            return None
+        fixtures.add(url, response.text, response.headers.get('Content-Type', 'text/plain'), response.status_code)
+        return response
+
+    for source in get_news_sources():
+        for feed_url in getattr(source, 'feed_urls', []):
+            response = keep(feed_url)
+            if response is not None and response.ok:
+                try:
+                    article_urls.extend(item['link'] for item in iter_feed_items(response.content) if item.get('link'))
+                except Exception as e:
+                    print(f"Unparseable feed {feed_url}: {e}")
+
+    response = keep(GDELT_URL, {'query': f"{query} sourceloc:USA", 'mode': 'artlist', 'format': 'json',
+                                'timespan': str(days * 24 * 60), 'sort': 'DateDesc', 'maxrecords': 50})
+    if response is not None and response.ok:
+        article_urls.extend(a['url'] for a in response.json().get('articles', []))
+
+    if google_key and google_cx:
+        response = keep(GOOGLE_URL, {'key': google_key, 'cx': google_cx, 'q': f"{query} news articles",
+                                     'dateRestrict': f'd{days}', 'num': 10, 'safe': 'active'})
+        if response is not None and response.ok:
+            article_urls.extend(item['link'] for item in response.json().get('items', []))
+
+    for url in dict.fromkeys(article_urls):
+        keep(url)
+    return fixtures
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    fixtures: FixtureSet = None
+    latency: float = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        response = self.fixtures.responses.get(self.path.lstrip('/').split('?')[0])
+        if response is None:
+            self.send_error(404)
+            return
+        body = response['body'].encode('utf-8')
+        self.send_response(response['status'])
+        self.send_header('Content-Type', response['content_type'])
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer:
+    """
+    Serve a fixture set on localhost and route the app's outgoing requests to it.
+    An upstream URL https://host/path?q is fetched as http://127.0.0.1:<port>/host/path?q.
+    """
+    def __init__(self, fixtures: FixtureSet, latency: float = 0.0):
+        handler = type('ReplayHandler', (_ReplayHandler,), {'fixtures': fixtures, 'latency': latency})
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._original_request = None
+
+    def rewrite(self, url: str) -> str:
+        parts = urlsplit(url)
+        if parts.netloc.startswith('127.0.0.1'):
+            return url
+        query = f"?{parts.query}" if parts.query else ''
+        return f"{self.base_url}/{parts.netloc}{parts.path}{query}"
+
+    def __enter__(self) -> 'ReplayServer':
+        import requests
+
+        threading.Thread(target=self.server.serve_forever, name='fixture-replay', daemon=True).start()
+        self._original_request = requests.Session.request
+        original, rewrite = self._original_request, self.rewrite
+
+        def request(session, method, url, *args, **kwargs):
+            return original(session, method, rewrite(url), *args, **kwargs)
+
+        requests.Session.request = request
+        return self
+
+    def __exit__(self, *exc):
+        import requests
+
+        requests.Session.request = self._original_request
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = sub.add_parser('record', help='Record live upstream responses (needs network)')
+    record_parser.add_argument('query')
+    record_parser.add_argument('--days', type=int, default=7)
+    record_parser.add_argument('-o', '--output', required=True)
+
+    synth_parser = sub.add_parser('synthesize', help='Write a synthetic fixture set')
+    synth_parser.add_argument('query', nargs='?', default='election')
+    synth_parser.add_argument('--days', type=int, default=7)
+    synth_parser.add_argument('--seed', type=int, default=42)
+    synth_parser.add_argument('-o', '--output', required=True)
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        fixtures = record(args.query, args.days, os.environ.get('GOOGLE_SEARCH_API_KEY'),
+                          os.environ.get('GOOGLE_SEARCH_ENGINE_ID'))
+    else:
+        fixtures = synthesize(args.query, args.days, args.seed)
+        fixtures.recorded_at = datetime.now(timezone.utc).isoformat()
+    fixtures.save(args.output)
+    print(f"Saved {len(fixtures.responses)} responses to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
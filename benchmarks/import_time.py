@@ -0,0 +1,87 @@
+"""
+Import-time benchmark for the app's modules.
+
+Each module is imported in a fresh interpreter with -X importtime, so the
+numbers reflect a cold start. Exits non-zero when a module goes over its
+budget, which makes it usable as a regression guard in CI:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 5 news_fetcher
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budgets in milliseconds
+BUDGETS_MS = {
+    'news_sources': 400,
+    'news_fetcher': 1500,  # Includes streamlit
+    'bias_analyzer': 50,
+    'news_summarizer': 150,  # Includes psycopg2
+    'search_agent': 50,
+    'chatbot': 50,
+    'image_generator': 50,
+    'database': 150,
+    'utils': 50,
+}
+
+# Modules that must not be imported as a side effect of the ones above.
+# plotly is not listed because streamlit itself imports it.
+HEAVY_MODULES = ('openai', 'anthropic', 'nltk', 'trafilatura')
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(module: str) -> dict:
+    """Import a module in a fresh interpreter and return its cumulative time and what it loaded"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative_us = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        loaded.add(name.split('.')[0])
+        if name == module:
+            cumulative_us = int(match.group(2))
+
+    return {
+        'ms': cumulative_us / 1000,
+        'heavy': sorted(loaded.intersection(HEAVY_MODULES))
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', help='Modules to measure (default: all budgeted modules)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per module; the median is reported')
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<18}{'median ms':>10}{'budget':>8}  heavy imports")
+    for module in args.modules or BUDGETS_MS:
+        runs = [measure(module) for _ in range(args.repeat)]
+        median_ms = statistics.median(run['ms'] for run in runs)
+        heavy = runs[-1]['heavy']
+        budget = BUDGETS_MS.get(module)
+        over = (budget is not None and median_ms > budget) or bool(heavy)
+        failed = failed or over
+        print(f"{module:<18}{median_ms:>10.1f}{budget or '-':>8}  {', '.join(heavy) or '-'}{'  <-- FAIL' if over else ''}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Offline stand-ins for the OpenAI and Anthropic clients.
+
+They answer the prompts the app sends (article enhancement, summaries, relevance
+and ranking) with well-formed, deterministic replies after an optional fixed
+latency, so benchmark runs exercise the same parsing and merging code as live runs.
+"""
+import json
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+
+def _score(text: str) -> float:
+    """Deterministic value in [-1, 1] derived from the text"""
+    return (zlib.crc32(text.encode()) % 2001) / 1000 - 1
+
+
+def _json_after(marker: str, text: str) -> Dict[str, Any]:
+    """Parse the JSON object that follows marker in a prompt"""
+    start = text.index('{', text.index(marker))
+    return json.JSONDecoder().raw_decode(text[start:])[0]
+
+
+class _Completions:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def create(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        system = next((m['content'] for m in messages if m['role'] == 'system'), '')
+        user = messages[-1]['content']
+        if 'news analysis AI' in system:
+            articles = json.loads(user)['articles']
+            reply = {'articles': [{
+                'bias_score': _score(a['title']),
+                'political_bias': _score(a['title']),
+                'sentiment': ('negative', 'neutral', 'positive')[zlib.crc32(a['content'].encode()) % 3],
+                'outlet_size': (1.0, 0.5, 0.0)[zlib.crc32(a['source'].encode()) % 3]
+            } for a in articles]}
+        else:
+            count = user.count('Title: ')
+            reply = {'points': [f"Key development {i + 1} in the coverage" for i in range(min(3, count))],
+                     'article_indices': list(range(min(3, count)))}
+
+        message = SimpleNamespace(content=json.dumps(reply))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class StubOpenAI:
+    """Answers chat.completions.create like the OpenAI client"""
+    def __init__(self, latency: float = 0.0):
+        self.chat = SimpleNamespace(completions=_Completions(latency))
+
+
+class _Messages:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def create(self, model: str, max_tokens: int, messages: List[Dict[str, str]], **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        prompt = messages[-1]['content']
+        articles = _json_after('Articles:', prompt)['articles']
+        if 'relevant_indices' in prompt:
+            # Keep roughly three quarters of the articles
+            reply = {'relevant_indices': [i for i, a in enumerate(articles) if zlib.crc32(a['title'].encode()) % 4]}
+        else:
+            order = sorted(range(len(articles)), key=lambda i: _score(articles[i]['title']))
+            reply = {'ranked_indices': order}
+        # The app parses message content as a JSON string
+        return SimpleNamespace(content=json.dumps(reply))
+
+
+class StubAnthropic:
+    """Answers messages.create like the Anthropic client"""
+    def __init__(self, latency: float = 0.0):
+        self.messages = _Messages(latency)
@@ -0,0 +1,370 @@
+"""
+Offline benchmark of the news pipeline.
+
+Upstream feeds, APIs and article pages are replayed from a fixture set through a
+local HTTP server (see fixtures.py) and the LLM clients are replaced with stubs
+(see llm_stubs.py), so runs need no network or API keys and are repeatable:
+
+    python benchmarks/pipeline.py
+    python benchmarks/pipeline.py --fixtures benchmarks/fixtures/climate.json.gz --llm-latency 0.5
+    python benchmarks/pipeline.py --save-baseline baseline.json
+    python benchmarks/pipeline.py --baseline baseline.json   # exits non-zero on regression
+
+Each scenario reports throughput, latency percentiles, peak traced memory and,
+from the app's stage metrics, where the time went.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from fixtures import FixtureSet, ReplayServer, synthesize
+from llm_stubs import StubAnthropic, StubOpenAI
+
+# Metrics compared against the baseline; higher is worse for all of them
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'peak_mb')
+
+
+class Context:
+    """What scenarios share: the query, run sizes and the articles one pipeline run produced"""
+    def __init__(self, query: str, days: int, source_count: int, ops: int, seed: int):
+        self.query = query
+        self.days = days
+        self.source_count = source_count
+        self.ops = ops
+        self.rng = random.Random(seed)
+        self.articles: List[Dict] = []
+
+
+def reset_pipeline_caches():
+    """Forget everything cached between pipeline runs so each run does the full work"""
+    import news_fetcher
+    import rate_limiter
+    import result_cache
+
+    news_fetcher.fetch_from_source.clear()
+    news_fetcher.enhance_articles_batch.clear()
+    with news_fetcher.source_fetches_lock:
+        news_fetcher.source_fetches.clear()
+    with rate_limiter._guards_lock:
+        rate_limiter._guards.clear()
+    with result_cache._result_cache_lock:
+        result_cache._result_cache = None
+    with news_fetcher.enriched_articles_lock:
+        news_fetcher.enriched_articles.clear()
+
+
+def reset_view_caches():
+    import article_views
+
+    with article_views._views_lock:
+        article_views._views.clear()
+        article_views._tables.clear()
+
+
+def scenario_fetch_news(ctx: Context) -> Iterator[Callable]:
+    """Cold pipeline run: fetch, extract, filter, rank and enhance"""
+    from news_fetcher import run_news_pipeline
+
+    for _ in range(ctx.ops):
+        reset_pipeline_caches()
+        yield lambda: run_news_pipeline(ctx.query, ctx.days, ctx.source_count)
+
+
+def scenario_first_page_lazy(ctx: Context) -> Iterator[Callable]:
+    """Cold lazy pagination: metadata for the whole result set, enrichment for the first page only"""
+    from news_fetcher import enrich_articles, run_news_pipeline
+
+    def first_page():
+        articles = run_news_pipeline(ctx.query, ctx.days, ctx.source_count, metadata_only=True)
+        return enrich_articles(articles[:10], ctx.query)
+
+    for _ in range(ctx.ops):
+        reset_pipeline_caches()
+        yield first_page
+
+
+def scenario_fetch_news_cached(ctx: Context) -> Iterator[Callable]:
+    """Repeated query served from the result cache"""
+    from news_fetcher import fetch_news
+
+    reset_pipeline_caches()
+    fetch_news(ctx.query, ctx.days, ctx.source_count)
+    for _ in range(ctx.ops):
+        yield lambda: fetch_news(ctx.query, ctx.days, ctx.source_count)
+
+
+def scenario_analyze_bias(ctx: Context) -> Iterator[Callable]:
+    """Bias and sentiment analysis of one article"""
+    from bias_analyzer import analyze_bias
+
+    for i in range(ctx.ops * 10):
+        article = ctx.articles[i % len(ctx.articles)]
+        yield lambda article=article: analyze_bias(article['content'], article['source'])
+
+
+def scenario_summarize_articles(ctx: Context) -> Iterator[Callable]:
+    """Summary of the top articles for a topic"""
+    from news_summarizer import summarize_articles
+
+    for i in range(ctx.ops):
+        # Vary the article window so each call is a summary cache miss
+        start = i % max(len(ctx.articles) - 5, 1)
+        articles = ctx.articles[start:start + 5]
+        yield lambda articles=articles: summarize_articles(articles, ctx.query)
+
+
+def scenario_paginate(ctx: Context) -> Iterator[Callable]:
+    """One page of results for a random filter combination, as main.get_paginated_articles serves it"""
+    from article_table import SIZE_LABEL_TIERS
+    from article_views import articles_fingerprint, get_paginated_view
+
+    reset_view_caches()
+    fingerprint = articles_fingerprint(ctx.articles)
+    sizes = ["All Sizes"] + list(SIZE_LABEL_TIERS)
+    leanings = ["All Views", "Left Leaning", "Center", "Right Leaning"]
+    for _ in range(ctx.ops * 20):
+        filters = {'topic': ctx.query, 'size': ctx.rng.choice(sizes), 'leaning': ctx.rng.choice(leanings)}
+        page = ctx.rng.randint(1, 3)
+        yield lambda filters=filters, page=page: get_paginated_view(ctx.articles, fingerprint, filters, page, 10)
+
+
+def scenario_paginate_db(ctx: Context) -> Iterator[Callable]:
+    """database.get_paginated_articles against DATABASE_URL, with the replayed articles stored"""
+    if not os.environ.get('DATABASE_URL'):
+        return
+    from database import get_paginated_articles, init_db, save_article
+
+    init_db()
+    for article in ctx.articles:
+        save_article({**article, 'bias_score': article.get('bias_score', 0.0),
+                      'sentiment': article.get('sentiment', 'neutral')})
+    for _ in range(ctx.ops * 5):
+        filters = {'topic': ctx.query} if ctx.rng.random() < 0.5 else {}
+        page = ctx.rng.randint(1, 3)
+        yield lambda filters=filters, page=page: get_paginated_articles(filters, page, 10)
+
+
+SCENARIOS = {
+    'fetch_news': scenario_fetch_news,
+    'first_page_lazy': scenario_first_page_lazy,
+    'fetch_news_cached': scenario_fetch_news_cached,
+    'analyze_bias': scenario_analyze_bias,
+    'summarize_articles': scenario_summarize_articles,
+    'paginate': scenario_paginate,
+    'paginate_db': scenario_paginate_db,
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def stage_snapshot() -> Dict[str, List[float]]:
+    """Total seconds and runs per pipeline stage recorded so far"""
+    from metrics import STAGE_SECONDS
+
+    totals: Dict[str, List[float]] = {}
+    with STAGE_SECONDS.lock:
+        for key, entry in STAGE_SECONDS.values.items():
+            stage = dict(key)['stage']
+            total = totals.setdefault(stage, [0.0, 0])
+            total[0] += entry[-2]
+            total[1] += entry[-1]
+    return totals
+
+
+def run_scenario(name: str, ctx: Context, memory_ops: int, quiet: bool) -> Dict:
+    """Time every operation of a scenario, then trace memory over a few more"""
+    output = io.StringIO() if quiet else sys.stdout
+    latencies = []
+    stage_totals: Dict[str, float] = {}
+    with contextlib.redirect_stdout(output):
+        for op in SCENARIOS[name](ctx):
+            # Snapshot per operation so scenario setup is not counted
+            before = stage_snapshot()
+            start = time.perf_counter()
+            op()
+            latencies.append(time.perf_counter() - start)
+            for stage, (total, _) in stage_snapshot().items():
+                spent = total - before.get(stage, (0.0, 0))[0]
+                if spent:
+                    stage_totals[stage] = stage_totals.get(stage, 0.0) + spent
+    if not latencies:
+        return None
+
+    peak = 0
+    with contextlib.redirect_stdout(output):
+        memory_ctx = Context(ctx.query, ctx.days, ctx.source_count, memory_ops, 0)
+        memory_ctx.articles = ctx.articles
+        for i, op in enumerate(SCENARIOS[name](memory_ctx)):
+            if i >= memory_ops:
+                break
+            tracemalloc.start()
+            op()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    stages = {stage: round(total / len(latencies) * 1000, 3) for stage, total in stage_totals.items()}
+
+    latencies.sort()
+    return {
+        'ops': len(latencies),
+        'throughput': round(len(latencies) / sum(latencies), 2),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'peak_mb': round(peak / 1024 / 1024, 3),
+        'stage_ms_per_op': stages
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Regressions beyond the tolerance, ignoring latency changes smaller than min_delta_ms"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            if metric.endswith('_ms') and new - old < min_delta_ms:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_results(results: Dict):
+    print(f"\n{'scenario':<20}{'ops':>6}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    for name, r in results['scenarios'].items():
+        print(f"{name:<20}{r['ops']:>6}{r['throughput']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+              f"{r['p99_ms']:>10}{r['peak_mb']:>10}")
+        if r['stage_ms_per_op']:
+            stages = sorted(r['stage_ms_per_op'].items(), key=lambda item: -item[1])
+            print(f"{'':<20}stages: " + ', '.join(f"{stage} {ms}ms" for stage, ms in stages))
+    for name in results['skipped']:
+        print(f"{name:<20}skipped (set DATABASE_URL)" if name == 'paginate_db' else f"{name:<20}skipped")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scenarios', nargs='*', help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--fixtures', help='Recorded fixture set (default: synthetic set)')
+    parser.add_argument('--query', default='election', help='Query for the synthetic fixture set')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--ops', type=int, default=5, help='Pipeline runs per scenario; cheap scenarios run more')
+    parser.add_argument('--memory-ops', type=int, default=2, help='Extra runs per scenario traced for peak memory')
+    parser.add_argument('--source-count', type=int, default=50)
+    parser.add_argument('--network-latency', type=float, default=0.0, help='Seconds added to each replayed response')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='Seconds added to each stubbed LLM call')
+    parser.add_argument('--no-llm', action='store_true', help='Run without LLM clients (fallback paths)')
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--save-baseline', help='Write results as the new baseline')
+    parser.add_argument('--baseline', help='Compare against a baseline and fail on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='Ignore latency changes smaller than this')
+    parser.add_argument('-v', '--verbose', action='store_true', help="Show the app's own output")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if args.fixtures:
+        fixtures = FixtureSet.load(args.fixtures)
+    else:
+        fixtures = synthesize(args.query, seed=args.seed)
+    days = fixtures.replay_days()
+
+    # Offline configuration: replayed Google API, stubbed LLMs, no upstream throttling
+    os.environ.setdefault('GOOGLE_SEARCH_API_KEY', 'benchmark')
+    os.environ.setdefault('GOOGLE_SEARCH_ENGINE_ID', 'benchmark')
+    import news_summarizer
+    import rate_limiter
+    import services
+
+    for name in rate_limiter.UPSTREAM_LIMITS:
+        rate_limiter.UPSTREAM_LIMITS[name] = {'rate': 1000.0, 'capacity': 1000}
+    services.reset_services()
+    services.override_service('openai', None if args.no_llm else StubOpenAI(args.llm_latency))
+    services.override_service('anthropic', StubAnthropic(args.llm_latency))
+    if args.no_llm:
+        services.override_service('search_agent', None)
+    news_summarizer.OPENAI_API_KEY = None if args.no_llm else 'benchmark'
+
+    ctx = Context(fixtures.query, days, args.source_count, args.ops, args.seed)
+    results = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'fixtures': args.fixtures or f"synthetic:{args.query}:{args.seed}",
+            'responses': len(fixtures.responses),
+            'network_latency': args.network_latency,
+            'llm_latency': None if args.no_llm else args.llm_latency
+        },
+        'scenarios': {},
+        'skipped': []
+    }
+
+    with ReplayServer(fixtures, args.network_latency):
+        from news_fetcher import run_news_pipeline
+
+        reset_pipeline_caches()
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+            ctx.articles = run_news_pipeline(ctx.query, ctx.days, ctx.source_count)
+        if not ctx.articles:
+            print("The pipeline returned no articles from the fixtures; nothing to benchmark")
+            return 1
+        print(f"Replaying {len(fixtures.responses)} responses; pipeline yields {len(ctx.articles)} articles")
+
+        for name in args.scenarios or SCENARIOS:
+            print(f"Running {name}...")
+            result = run_scenario(name, ctx, args.memory_ops, not args.verbose)
+            if result is None:
+                results['skipped'].append(name)
+            else:
+                results['scenarios'][name] = result
+
+    print_results(results)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,15 @@
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-from nltk.tokenize import word_tokenize, sent_tokenize
 import re
+from services import get_service, lazy_import, register_service
+from nltk_resources import has_resource
+from metrics import timed
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('sentiment/vader_lexicon.zip')
-    nltk.data.find('tokenizers/punkt_tab')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('vader_lexicon')
-    nltk.download('punkt_tab')
+def _create_sentiment_analyzer():
+    """Load the VADER analyzer from the bundled NLTK data; None if it was not provisioned"""
+    if not has_resource('vader_lexicon'):
+        return None
+    return lazy_import('nltk.sentiment').SentimentIntensityAnalyzer()
+
+register_service('sentiment_analyzer', _create_sentiment_analyzer)
 
 # Define major US news outlets based on December 2024 traffic data
 # Sources: Statista, Press Gazette, and Visual Capitalist
@@ -48,28 +46,35 @@ def get_outlet_size(source: str) -> float:
         return 0.5
     return 0.0  # Small outlets or unknown sources
 
+@timed('bias_analysis')
 def analyze_bias(text: str, source: str = "") -> dict:
     """
     Analyze text for bias using various metrics
     """
-    # Initialize analyzer
-    sia = SentimentIntensityAnalyzer()
+    # Shared analyzer, created on first use
+    sia = get_service('sentiment_analyzer')
+    tokenize = lazy_import('nltk.tokenize') if has_resource('punkt_tab') else None
 
     try:
         # Clean text
         clean_text = re.sub(r'[^\w\s]', '', text)
 
-        # Tokenize with error handling
+        # Tokenize with error handling; plain splitting if punkt was not provisioned
         try:
-            words = word_tokenize(clean_text.lower())
-            sentences = sent_tokenize(text)
+            if tokenize is None:
+                raise LookupError("punkt_tab not provisioned")
+            words = tokenize.word_tokenize(clean_text.lower())
+            sentences = tokenize.sent_tokenize(text)
+        except LookupError:
+            words = clean_text.lower().split()
+            sentences = [text]
         except Exception as e:
             print(f"Tokenization error: {e}")
             words = clean_text.lower().split()
             sentences = [text]
 
-        # Sentiment analysis
-        sentiment_scores = sia.polarity_scores(text)
+        # Sentiment analysis, neutral if the lexicon is unavailable
+        sentiment_scores = sia.polarity_scores(text) if sia else {'compound': 0.0}
 
         # Bias indicators
         conservative_words = {
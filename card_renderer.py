@@ -0,0 +1,93 @@
+import html
+import threading
+from hashlib import md5
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from logo_service import get_logo_url, placeholder_logo_url
+from utils import format_date
+
+# Bump when a template changes so cards rendered with the old markup are not reused
+CARD_TEMPLATE_VERSION = 1
+CARD_CACHE_SIZE = 2048  # Rendered cards kept across all sessions
+SNIPPET_CHARS = 200
+
+# (url, template, template version, topic, logo URL, content hash) -> card HTML
+_cards: "OrderedDict[Tuple[str, str, int, Optional[str], str, str], str]" = OrderedDict()
+_cards_lock = threading.Lock()
+
+# Markup is kept unindented: joined cards go through one markdown call, where
+# indented lines would be read as code blocks
+FULL_TEMPLATE = (
+    '<div class="news-card">'
+    '<img src="{logo_url}" class="news-logo" onerror="this.src=\'{placeholder_url}\'">'
+    '<div class="news-content">'
+    '<h3>{title}</h3>'
+    '<p>Source: {source} | Published: {published}</p>'
+    '<p>{snippet}...</p>'
+    '<a href="{url}" target="_blank">Read More</a>'
+    '</div></div>'
+)
+COMPACT_TEMPLATE = (
+    '<div class="news-card">'
+    '<img src="{logo_url}" class="news-logo">'
+    '<div class="news-content">'
+    '<h3>{title}</h3>'
+    '<p>Source: {source} | Published: {published}</p>'
+    '<p>Topic: {topic}</p>'
+    '<a href="{url}" target="_blank">Read More</a>'
+    '</div></div>'
+)
+TEMPLATES = {'full': FULL_TEMPLATE, 'compact': COMPACT_TEMPLATE}
+
+
+def _build_card(article: Dict[str, Any], template: str, topic: Optional[str], logo_url: str) -> str:
+    source = str(article.get('source') or '')
+    return TEMPLATES[template].format(
+        logo_url=html.escape(logo_url),
+        placeholder_url=html.escape(placeholder_logo_url()),
+        title=html.escape(str(article.get('title') or '')),
+        source=html.escape(source),
+        published=html.escape(str(format_date(article['published_at']))) if article.get('published_at') else '',
+        snippet=html.escape(str(article.get('content') or '')[:SNIPPET_CHARS]),
+        topic=html.escape(topic or ''),
+        url=html.escape(str(article.get('url') or ''))
+    )
+
+
+def _content_hash(article: Dict[str, Any]) -> str:
+    """Short hash of the article fields a card shows, so enriched articles get a fresh card"""
+    fields = (article.get('title'), article.get('source'), article.get('published_at'),
+              str(article.get('content') or '')[:SNIPPET_CHARS], article.get('sentiment'), article.get('bias_score'))
+    return md5('\0'.join(str(f) for f in fields).encode()).hexdigest()[:12]
+
+
+def render_card(article: Dict[str, Any], template: str = 'full', topic: Optional[str] = None) -> str:
+    """HTML for one article card, rendered once per article URL and template version"""
+    # The logo URL changes from the placeholder once the outlet's logo has been stored
+    logo_url = get_logo_url(str(article.get('source') or ''))
+    key = (article.get('url'), template, CARD_TEMPLATE_VERSION, topic, logo_url, _content_hash(article))
+    with _cards_lock:
+        card = _cards.get(key)
+        if card is not None:
+            _cards.move_to_end(key)
+            return card
+
+    card = _build_card(article, template, topic, logo_url)
+
+    with _cards_lock:
+        _cards[key] = card
+        while len(_cards) > CARD_CACHE_SIZE:
+            _cards.popitem(last=False)
+    return card
+
+
+def render_cards(articles: Iterable[Dict[str, Any]], template: str = 'full', topic: Optional[str] = None) -> str:
+    """HTML for a page of cards, to be emitted with a single st.markdown call"""
+    cards = []
+    for article in articles:
+        try:
+            cards.append(render_card(article, template, topic))
+        except Exception as e:
+            print(f"Error displaying article: {e}")
+    return '\n'.join(cards)
@@ -1,9 +1,6 @@
-import os
-import anthropic
-from typing import List, Dict, Any, Optional
-
-# Initialize Anthropic client
-client = anthropic.Anthropic(api_key=os.environ.get('ANTHROPIC_API_KEY'))
+from typing import List, Dict, Any, Iterator, Optional
+from services import get_anthropic_client
+from article_index import get_seeded_article_index
 
 class NewsAssistant:
     def __init__(self):
@@ -14,32 +11,71 @@ Your purpose is to:
 3. Provide brief summaries of news topics
 4. Answer questions about news sources and bias ratings
 
-Always keep responses focused on news-related queries."""
+Always keep responses focused on news-related queries.
+When relevant articles are provided, base your answer on them and cite them by number.
+If they don't cover the question, say so rather than guessing."""
+
+    def _format_message(self, user_message: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Append the active filters to the user's message"""
+        message_content = user_message
+        if context:
+            context_str = "\nCurrent filters:\n"
+            for key, value in context.items():
+                if value and value not in ['All', 'All Sizes', 'All Views']:
+                    context_str += f"- {key}: {value}\n"
+            message_content += context_str
+        return message_content
+
+    def _article_context(self, user_message: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Snippets of indexed articles matching the message and topic filter, within a fixed token budget"""
+        query = user_message
+        topic = (context or {}).get('topic')
+        if topic and topic != 'All':
+            query += f" {topic}"
+        try:
+            return get_seeded_article_index().build_context(query)
+        except Exception as e:
+            print(f"Error retrieving articles for chat: {e}")
+            return ""
+
+    def _request(self, user_message: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        system = self.system_prompt
+        articles = self._article_context(user_message, context)
+        if articles:
+            system += f"\n\nRelevant articles:\n{articles}"
+        return dict(
+            model="claude-3-5-sonnet-20241022",  # Latest model as of Oct 2024
+            max_tokens=300,  # Keep responses concise
+            system=system,
+            messages=[
+                {"role": "user", "content": self._format_message(user_message, context)}
+            ]
+        )
 
     def get_response(self, user_message: str, context: Optional[Dict[str, Any]] = None) -> str:
         """Generate a response to user message with optional context"""
         try:
-            # Format the complete message with context if available
-            message_content = user_message
-            if context:
-                context_str = "\nCurrent filters:\n"
-                for key, value in context.items():
-                    if value and value not in ['All', 'All Sizes', 'All Views']:
-                        context_str += f"- {key}: {value}\n"
-                message_content += context_str
-
             # Call Anthropic API with the latest model
-            response = client.messages.create(
-                model="claude-3-5-sonnet-20241022",  # Latest model as of Oct 2024
-                max_tokens=300,  # Keep responses concise
-                system=self.system_prompt,
-                messages=[
-                    {"role": "user", "content": message_content}
-                ]
-            )
+            response = get_anthropic_client().messages.create(**self._request(user_message, context))
 
             return response.content[0].text
 
         except Exception as e:
             print(f"Error in get_response: {e}")
-            return "I apologize, but I'm having trouble responding right now. Please try again."
\ No newline at end of file
+            return "I apologize, but I'm having trouble responding right now. Please try again."
+
+    def stream_response(self, user_message: str, context: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Generate a response as text chunks, yielded as soon as the model produces them"""
+        streamed = False
+        try:
+            with get_anthropic_client().messages.stream(**self._request(user_message, context)) as stream:
+                for text in stream.text_stream:
+                    streamed = True
+                    yield text
+
+        except Exception as e:
+            print(f"Error in stream_response: {e}")
+            if streamed:
+                yield "\n\n_(Response interrupted. Please try again.)_"
+            else:
+                yield "I apologize, but I'm having trouble responding right now. Please try again."
@@ -2,13 +2,66 @@ from datetime import datetime
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
+import math
+import threading
+from query_matcher import compile_query
+from metrics import timed
+
+# Bias scores (-1 to 1) are counted in this many equal-width buckets; -1 means no score
+BIAS_BUCKETS = 20
+
+
+def bias_bucket_sql(column: str) -> str:
+    """SQL expression mapping a bias score column to its rollup bucket"""
+    return (f"CASE WHEN {column} IS NULL THEN -1 "
+            f"ELSE LEAST(GREATEST(FLOOR(({column} + 1) * {BIAS_BUCKETS // 2}), 0), {BIAS_BUCKETS - 1}) END")
+
+
+def bias_bucket(score) -> int:
+    """Python equivalent of bias_bucket_sql"""
+    if score is None:
+        return -1
+    return min(max(math.floor((score + 1) * (BIAS_BUCKETS // 2)), 0), BIAS_BUCKETS - 1)
+
+
+def bias_bucket_center(bucket: int) -> float:
+    """Midpoint bias score of a rollup bucket (None for unscored articles)"""
+    if bucket < 0:
+        return None
+    return -1 + (bucket + 0.5) * 2 / BIAS_BUCKETS
+
+
+ROLLUP_COLUMNS = f"""
+    published_at::date AS day,
+    source,
+    COALESCE(sentiment, 'unknown') AS sentiment,
+    {bias_bucket_sql('bias_score')} AS bias_bucket
+"""
+
+# Bump when update_article_rollups or the articles_rollup trigger changes, so init_db replaces them
+ROLLUP_TRIGGER_VERSION = 3
+
+# init_db runs at the top of every Streamlit rerun; the schema is set up once per process
+_db_initialized = False
+_db_init_lock = threading.Lock()
 
 def get_db_connection():
     """Create a database connection"""
     return psycopg2.connect(os.getenv('DATABASE_URL'))
 
 def init_db():
-    """Initialize database tables and indexes"""
+    """Initialize database tables and indexes, once per process"""
+    global _db_initialized
+    if _db_initialized:
+        return
+
+    with _db_init_lock:
+        if _db_initialized:
+            return
+        _create_schema()
+        _db_initialized = True
+
+def _create_schema():
     conn = get_db_connection()
     cur = conn.cursor()
 
@@ -40,6 +93,27 @@ def init_db():
             CREATE INDEX IF NOT EXISTS idx_articles_title_trgm ON articles USING GIN (title gin_trgm_ops);
         ''')
 
+        # Article counts per day, source, sentiment and bias bucket for the analytics dashboard
+        cur.execute('''
+            CREATE TABLE IF NOT EXISTS article_rollups (
+                day DATE NOT NULL,
+                source TEXT NOT NULL,
+                sentiment TEXT NOT NULL,
+                bias_bucket SMALLINT NOT NULL,
+                article_count INTEGER NOT NULL,
+                PRIMARY KEY (day, source, sentiment, bias_bucket)
+            )
+        ''')
+
+        # One-row counter bumped by every committed change to the rollups, for cache invalidation
+        cur.execute('''
+            CREATE TABLE IF NOT EXISTS article_rollups_version (version BIGINT NOT NULL);
+            INSERT INTO article_rollups_version (version)
+            SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM article_rollups_version);
+        ''')
+
+        _install_rollup_trigger(cur)
+
         conn.commit()
 
     except Exception as e:
@@ -49,6 +123,104 @@ def init_db():
         cur.close()
         conn.close()
 
+def _install_rollup_trigger(cur):
+    """
+    Create the trigger that keeps article_rollups current, or replace it and its
+    function when ROLLUP_TRIGGER_VERSION changes. Skipped when both are current,
+    since creating a trigger locks the articles table against readers and writers.
+    """
+    cur.execute('''
+        SELECT d.description
+        FROM pg_proc p
+        LEFT JOIN pg_description d ON d.objoid = p.oid AND d.classoid = 'pg_proc'::regclass
+        WHERE p.proname = 'update_article_rollups'
+    ''')
+    row = cur.fetchone()
+    function_current = row is not None and row[0] == f'version {ROLLUP_TRIGGER_VERSION}'
+    cur.execute('''
+        SELECT d.description
+        FROM pg_trigger t
+        LEFT JOIN pg_description d ON d.objoid = t.oid AND d.classoid = 'pg_trigger'::regclass
+        WHERE t.tgname = 'articles_rollup' AND t.tgrelid = 'articles'::regclass
+    ''')
+    row = cur.fetchone()
+    trigger_exists = row is not None
+    trigger_current = trigger_exists and row[0] == f'version {ROLLUP_TRIGGER_VERSION}'
+    if function_current and trigger_current:
+        return
+
+    # Keep the rollups current on every insert, update and delete of an article, and
+    # bump the version on any change query_analytics_rows can see
+    cur.execute(f'''
+        CREATE OR REPLACE FUNCTION update_article_rollups() RETURNS trigger AS $$
+        DECLARE
+            old_bucket SMALLINT;
+            new_bucket SMALLINT;
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                old_bucket := {bias_bucket_sql('OLD.bias_score')};
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                new_bucket := {bias_bucket_sql('NEW.bias_score')};
+            END IF;
+
+            IF TG_OP = 'UPDATE'
+               AND OLD.published_at::date = NEW.published_at::date
+               AND OLD.source = NEW.source
+               AND COALESCE(OLD.sentiment, 'unknown') = COALESCE(NEW.sentiment, 'unknown')
+               AND old_bucket = new_bucket THEN
+                -- Rolling windows read the exact timestamp, and topic drill-downs the title
+                IF OLD.published_at IS DISTINCT FROM NEW.published_at
+                   OR OLD.title IS DISTINCT FROM NEW.title THEN
+                    UPDATE article_rollups_version SET version = version + 1;
+                END IF;
+                RETURN NULL;
+            END IF;
+
+            UPDATE article_rollups_version SET version = version + 1;
+
+            IF TG_OP <> 'INSERT' THEN
+                UPDATE article_rollups SET article_count = article_count - 1
+                WHERE day = OLD.published_at::date AND source = OLD.source
+                  AND sentiment = COALESCE(OLD.sentiment, 'unknown') AND bias_bucket = old_bucket;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                INSERT INTO article_rollups (day, source, sentiment, bias_bucket, article_count)
+                VALUES (NEW.published_at::date, NEW.source, COALESCE(NEW.sentiment, 'unknown'), new_bucket, 1)
+                ON CONFLICT (day, source, sentiment, bias_bucket)
+                DO UPDATE SET article_count = article_rollups.article_count + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        COMMENT ON FUNCTION update_article_rollups() IS 'version {ROLLUP_TRIGGER_VERSION}';
+    ''')
+    if trigger_current:
+        return
+
+    cur.execute(f'''
+        DROP TRIGGER IF EXISTS articles_rollup ON articles;
+        CREATE TRIGGER articles_rollup
+            AFTER INSERT OR DELETE OR UPDATE OF published_at, source, sentiment, bias_score, title ON articles
+            FOR EACH ROW EXECUTE FUNCTION update_article_rollups();
+        COMMENT ON TRIGGER articles_rollup ON articles IS 'version {ROLLUP_TRIGGER_VERSION}';
+    ''')
+    if trigger_exists:
+        return  # Replaced; its rollups are already populated
+
+    # Backfill articles stored before the rollups existed. The trigger lock
+    # blocks concurrent writes until commit, so nothing is counted twice.
+    cur.execute(f'''
+        INSERT INTO article_rollups (day, source, sentiment, bias_bucket, article_count)
+        SELECT day, source, sentiment, bias_bucket, COUNT(*)
+        FROM (SELECT {ROLLUP_COLUMNS} FROM articles) a
+        WHERE NOT EXISTS (SELECT 1 FROM article_rollups)
+        GROUP BY day, source, sentiment, bias_bucket
+    ''')
+    cur.execute('UPDATE article_rollups_version SET version = version + 1')
+
+@timed('db_query', query='paginated_articles')
 def get_paginated_articles(filters, page=1, per_page=10):
     """Get paginated articles with filters"""
     conn = get_db_connection()
@@ -71,8 +243,10 @@ def get_paginated_articles(filters, page=1, per_page=10):
             params.append(filters['source'])
 
         if filters.get('topic') and filters['topic'] != 'All':
-            query += ' AND title ILIKE %s'
-            params.append(f'%{filters["topic"]}%')
+            # Same quoted phrase / | / implicit AND semantics as feed filtering
+            topic_clause, topic_params = compile_query(filters['topic']).sql_clause(['title'])
+            query += f' AND {topic_clause}'
+            params.extend(topic_params)
 
         # Add ordering and pagination
         query += '''
@@ -101,6 +275,7 @@ def get_paginated_articles(filters, page=1, per_page=10):
         cur.close()
         conn.close()
 
+@timed('db_query', query='save_article')
 def save_article(article_data):
     """Save an article to the database"""
     conn = get_db_connection()
@@ -134,6 +309,7 @@ def save_article(article_data):
         cur.close()
         conn.close()
 
+@timed('db_query', query='cached_analysis')
 def get_cached_analysis(topic, max_age_hours=1):
     """Get cached analysis results if they exist and are recent"""
     conn = get_db_connection()
@@ -149,4 +325,74 @@ def get_cached_analysis(topic, max_age_hours=1):
         return result['data'] if result else None
     finally:
         cur.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+@timed('db_query', query='refresh_rollups')
+def refresh_article_rollups(days=None):
+    """
+    Rebuild the rollups from the articles table, for the last `days` days or everything.
+    The trigger keeps them current; run this periodically to repair drift
+    (e.g. after bulk loads with triggers disabled).
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    try:
+        since = "(NOW() - make_interval(days => %s))::date"
+        article_window = f"WHERE published_at >= {since}" if days else ""
+        rollup_window = f"WHERE day >= {since}" if days else ""
+        params = (days,) if days else ()
+        # Lock out writers so the rebuild and the trigger don't race
+        cur.execute('LOCK TABLE articles IN SHARE MODE')
+        cur.execute(f'DELETE FROM article_rollups {rollup_window}', params)
+        cur.execute(f'''
+            INSERT INTO article_rollups (day, source, sentiment, bias_bucket, article_count)
+            SELECT day, source, sentiment, bias_bucket, COUNT(*)
+            FROM (SELECT {ROLLUP_COLUMNS} FROM articles {article_window}) a
+            GROUP BY day, source, sentiment, bias_bucket
+        ''', params)
+        cur.execute('UPDATE article_rollups_version SET version = version + 1')
+        conn.commit()
+    except Exception as e:
+        print(f"Error refreshing article rollups: {e}")
+        conn.rollback()
+    finally:
+        cur.close()
+        conn.close()
+
+@timed('db_query', query='data_version')
+def get_data_version():
+    """
+    A number that changes whenever the analytics data changes, for invalidating caches.
+    Bumped by the rollup trigger and by refresh_article_rollups in the same transaction
+    as the change, so it never runs ahead of committed rows.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    try:
+        cur.execute('SELECT version FROM article_rollups_version')
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+        conn.close()
+
+@timed('db_query', query='recent_articles')
+def get_recent_articles(days=7, limit=5000):
+    """The newest stored articles from the last `days` days, for the chatbot's article index"""
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+
+    try:
+        cur.execute('''
+            SELECT title, content, url, source, published_at
+            FROM articles
+            WHERE published_at >= NOW() - make_interval(days => %s)
+            ORDER BY published_at DESC
+            LIMIT %s
+        ''', (days, limit))
+        # Oldest first, so the newest articles are the last to be evicted from the index
+        return list(reversed(cur.fetchall()))
+    finally:
+        cur.close()
+        conn.close()
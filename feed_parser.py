@@ -0,0 +1,101 @@
+import io
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+# Consecutive old items that end parsing of a newest-first feed in which no recent
+# item has been seen yet (a pinned or stale item at the top must not drop the feed)
+MAX_LEADING_STALE_ITEMS = 5
+
+# Child element tag -> item field, per feed type
+RSS_FIELDS = {
+    'title': 'title',
+    'link': 'link',
+    'pubDate': 'pub_date',
+    'description': 'description'
+}
+ATOM_FIELDS = {
+    ATOM_NS + 'title': 'title',
+    ATOM_NS + 'link': 'link',
+    ATOM_NS + 'updated': 'pub_date',
+    ATOM_NS + 'summary': 'description'
+}
+
+
+def iter_feed_items(content: bytes,
+                    cutoff_date: Optional[datetime] = None,
+                    parse_date: Optional[Callable[[str], datetime]] = None) -> Iterator[Dict[str, object]]:
+    """
+    Stream title/link/pub_date/description from an RSS or Atom feed in a single pass.
+
+    Each item is released as soon as it has been yielded, so memory stays flat for
+    large feeds. With cutoff_date and parse_date, items older than the cutoff are
+    skipped. While the feed has been in newest-first order so far, parsing stops at
+    the first old item after a recent one, or after MAX_LEADING_STALE_ITEMS old
+    items in a row at the top of the feed.
+    """
+    fields = None
+    item_tag = None
+    item = None
+    item_depth = 0
+    stack = []
+    previous = None
+    date_sorted = True
+    seen_recent = False
+    stale_run = 0
+
+    for event, elem in ET.iterparse(io.BytesIO(content), events=('start', 'end')):
+        if event == 'start':
+            if fields is None:
+                # The root tag decides the feed type once for the whole document
+                if 'rss' in elem.tag:
+                    fields, item_tag = RSS_FIELDS, 'item'
+                else:
+                    fields, item_tag = ATOM_FIELDS, ATOM_NS + 'entry'
+            if item is None and elem.tag == item_tag:
+                item = {'title': '', 'link': '', 'pub_date': '', 'description': ''}
+                item_depth = len(stack)
+            stack.append(elem)
+            continue
+
+        stack.pop()
+
+        if item is None:
+            continue
+
+        if len(stack) == item_depth + 1 and elem.tag in fields:
+            # Direct children of the item only, first occurrence wins
+            key = fields[elem.tag]
+            if not item[key]:
+                if key == 'link' and fields is ATOM_FIELDS:
+                    item[key] = elem.get('href') or ''
+                else:
+                    item[key] = elem.text or ''
+            continue
+
+        if elem.tag != item_tag or len(stack) != item_depth:
+            continue
+
+        current, item = item, None
+        # Release the finished item and detach it from its parent
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+        if cutoff_date is not None and parse_date is not None and current['pub_date']:
+            published = parse_date(current['pub_date'])
+            if previous is not None and published > previous:
+                date_sorted = False
+            previous = published
+            if published < cutoff_date:
+                stale_run += 1
+                if date_sorted and (seen_recent or stale_run >= MAX_LEADING_STALE_ITEMS):
+                    return
+                continue
+            seen_recent = True
+            stale_run = 0
+            current['published'] = published
+
+        yield current
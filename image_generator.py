@@ -1,23 +1,92 @@
 import os
+import io
 import base64
-from openai import OpenAI
+from functools import lru_cache
+from hashlib import sha256
+from typing import Optional
+import requests
+from services import get_openai_client, lazy_import
+from single_flight import SingleFlight
+from metrics import record_cache, stage_timer
+from static_assets import STATIC_ROOT, data_url, static_serving_enabled, static_url, write_static_file
 
 # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
 # do not change this unless explicitly requested by the user
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+
+# Generated images are stored once, named by a hash of model, size and prompt
+IMAGE_CACHE_SUBDIR = os.path.join("generated", "images")
+
+# Without static serving, images are inlined into the page; keep those small
+INLINE_IMAGE_MAX_SIZE = 512  # Pixels
+INLINE_IMAGE_QUALITY = 80  # JPEG quality
+
+image_urls = {}  # cache key -> static URL served to the browser
+image_requests = SingleFlight()
+
+def image_cache_key(prompt: str, size: str, model: str) -> str:
+    """Content address of a generated image"""
+    return sha256(f"{model}\0{size}\0{prompt}".encode()).hexdigest()
+
+def _load_or_generate_image(key: str, prompt: str, size: str, model: str) -> Optional[str]:
+    path = os.path.join(STATIC_ROOT, IMAGE_CACHE_SUBDIR, f"{key}.png")
+    if os.path.exists(path):
+        record_cache('images', True)
+    else:
+        if not OPENAI_API_KEY:
+            return None
+        # Only a DALL-E call counts as a miss
+        record_cache('images', False)
+        with stage_timer('image_generation'):
+            response = get_openai_client().images.generate(
+                model=model,
+                prompt=prompt,
+                n=1,
+                size=size
+            )
+            # DALL-E URLs expire, so keep the image itself
+            image = requests.get(response.data[0].url, timeout=30)
+            image.raise_for_status()
+        write_static_file(IMAGE_CACHE_SUBDIR, f"{key}.png", image.content)
+
+    if not static_serving_enabled():
+        return _inline_image_url(path)
+    url = static_url(path)
+    image_urls[key] = url
+    return url
+
+@lru_cache(maxsize=4)
+def _inline_image_url(path: str) -> str:
+    """A downscaled JPEG data URL for a stored image, for when static serving is off"""
+    Image = lazy_import('PIL.Image')
+    with Image.open(path) as img:
+        img = img.convert('RGB')
+        img.thumbnail((INLINE_IMAGE_MAX_SIZE, INLINE_IMAGE_MAX_SIZE))
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=INLINE_IMAGE_QUALITY, optimize=True)
+    return data_url(buffer.getvalue(), 'jpg')
+
+def generate_cached_image(prompt: str, size: str, model: str = "dall-e-3") -> Optional[str]:
+    """
+    Get a generated image from the disk cache, calling DALL-E only on the first request.
+    Returns None when the image is not cached and no OpenAI key is configured.
+    """
+    key = image_cache_key(prompt, size, model)
+    url = image_urls.get(key)
+    if url:
+        record_cache('images', True)
+        return url
+    return image_requests.do(key, _load_or_generate_image, key, prompt, size, model)
 
 def generate_app_logo():
     """Generate the app logo using DALL-E"""
     try:
-        if OPENAI_API_KEY:
-            response = client.images.generate(
-                model="dall-e-3",
-                prompt="Create a modern, professional logo for 'News Jungle' - a news aggregation platform. Use imagery that combines journalism and jungle themes in a subtle way. The design should be minimalist and suitable for a website header.",
-                n=1,
-                size="256x256"
-            )
-            return response.data[0].url
+        url = generate_cached_image(
+            "Create a modern, professional logo for 'News Jungle' - a news aggregation platform. Use imagery that combines journalism and jungle themes in a subtle way. The design should be minimalist and suitable for a website header.",
+            size="256x256"
+        )
+        if url:
+            return url
     except Exception as e:
         print(f"Failed to generate logo: {e}")
         return get_fallback_logo()
@@ -33,23 +102,22 @@ def generate_background_image(page="main"):
     }
 
     try:
-        if OPENAI_API_KEY:
-            theme = themes.get(page, themes["main"])
-            response = client.images.generate(
-                model="dall-e-3",
-                prompt=f"Create a subtle, professional background texture for a news website. {theme}. Make it very light and suitable for text overlay.",
-                n=1,
-                size="1024x1024"
-            )
-            return response.data[0].url
+        theme = themes.get(page, themes["main"])
+        url = generate_cached_image(
+            f"Create a subtle, professional background texture for a news website. {theme}. Make it very light and suitable for text overlay.",
+            size="1024x1024"
+        )
+        if url:
+            return url
     except Exception as e:
         print(f"Failed to generate background: {e}")
         return get_fallback_background(page)
 
     return get_fallback_background(page)
 
+@lru_cache(maxsize=1)
 def get_fallback_logo():
-    """Generate a simple SVG logo for fallback"""
+    """Generate a simple SVG logo for fallback, built once per process"""
     svg = '''
         <svg width="256" height="256" xmlns="http://www.w3.org/2000/svg">
             <defs>
@@ -71,8 +139,9 @@ def get_fallback_logo():
     '''
     return "data:image/svg+xml;base64," + base64.b64encode(svg.encode()).decode()
 
+@lru_cache(maxsize=8)
 def get_fallback_background(page="main"):
-    """Generate a fallback background pattern based on the page"""
+    """Generate a fallback background pattern based on the page, built once per process"""
     colors = {
         "main": ("#4A7B4B", "#2C3E2D"),
         "filters": ("#3B614C", "#1E2F2E"),
@@ -7,13 +7,21 @@ st.set_page_config(
 )
 
 import json
-import pandas as pd
-from news_fetcher import fetch_news
+from news_fetcher import enrich_articles, fetch_news, fetch_news_metadata, prefetch_enrichment
 from bias_analyzer import analyze_bias
-from utils import format_date, clean_text, sentiment_to_emoji
+from utils import clean_text, sentiment_to_emoji
 from database import init_db, save_article, get_cached_analysis
 from news_sources import get_news_sources
 from theme_manager import ThemeManager
+from article_views import articles_fingerprint, get_paginated_view
+from card_renderer import render_cards
+from nltk_resources import warmup
+from metrics import start_metrics_server
+
+# Validate and preload bundled NLTK data once per process
+warmup()
+# Expose /metrics when METRICS_PORT is set
+start_metrics_server()
 
 # Initialize theme manager and apply styles
 theme_manager = ThemeManager()
@@ -26,6 +34,10 @@ if 'cached_news' not in st.session_state:
     st.session_state.cached_news = None
 if 'last_query' not in st.session_state:
     st.session_state.last_query = None
+if 'cached_news_key' not in st.session_state:
+    st.session_state.cached_news_key = None
+if 'cached_news_lazy' not in st.session_state:
+    st.session_state.cached_news_lazy = None
 if 'filters' not in st.session_state:
     st.session_state.filters = {
         'topic': 'All',
@@ -112,55 +124,44 @@ else:  # Results page
     st.title("News Results")
 
     def get_paginated_articles(filters, page, per_page):
-        """Get paginated articles with optimized caching"""
-        if st.session_state.cached_news is None or st.session_state.last_query != filters['topic']:
+        """
+        Get paginated articles from the shared filtered-view cache.
+        Without size or leaning filters, only metadata is fetched up front and each
+        page is enriched (full text, bias, AI enhancement) when shown, with the next
+        page prefetched. Those filters need every article's scores, so they fetch
+        the fully enriched result set.
+        """
+        lazy = (filters.get('size', "All Sizes") == "All Sizes"
+                and filters.get('leaning', "All Views") == "All Views")
+        if (st.session_state.cached_news is None or st.session_state.cached_news_key is None
+                or st.session_state.last_query != filters['topic']
+                or st.session_state.cached_news_lazy != lazy):
             search_term = filters['topic']
             with st.spinner("Fetching latest news..."):
-                articles = fetch_news(search_term, days_ago=5, source_count=50)
-                if articles:
-                    st.session_state.cached_news = articles
-                    st.session_state.last_query = search_term
-                else:
-                    st.session_state.cached_news = []
-                    st.session_state.last_query = search_term
-
-        articles = st.session_state.cached_news
-        df = pd.DataFrame(articles)
-
-        # Apply filters
-        if filters['size'] != "All Sizes":
-            if 'outlet_size' not in df.columns:
-                df['outlet_size'] = None
-            size_map = {
-                "Large Outlets": 1.0,
-                "Medium Outlets": 0.5,
-                "Small Outlets": 0.0
-            }
-            size_value = size_map[filters['size']]
-            df = df[df['outlet_size'].notna() & (df['outlet_size'] == size_value)]
-
-        if filters['leaning'] != "All Views":
-            if 'political_bias' not in df.columns:
-                df['political_bias'] = 0.0
-            leaning_filters = {
-                "Left Leaning": lambda x: x < -0.2,
-                "Center": lambda x: abs(x) <= 0.2,
-                "Right Leaning": lambda x: x > 0.2
-            }
-            df = df[df['political_bias'].apply(leaning_filters[filters['leaning']])]
-
-        total_articles = len(df)
-        start_index = (page - 1) * per_page
-        end_index = min(start_index + per_page, total_articles)
-        paginated_articles = df[start_index:end_index].to_dict(orient='records')
-        total_pages = (total_articles + per_page - 1) // per_page
-
-        return {
-            'articles': paginated_articles,
-            'total': total_articles,
-            'current_page': page,
-            'pages': total_pages
-        }
+                fetch = fetch_news_metadata if lazy else fetch_news
+                articles = fetch(search_term, days_ago=5, source_count=50)
+                st.session_state.cached_news = articles or []
+                st.session_state.cached_news_key = articles_fingerprint(st.session_state.cached_news)
+                st.session_state.cached_news_lazy = lazy
+                st.session_state.last_query = search_term
+
+        def view_page(number):
+            return get_paginated_view(
+                st.session_state.cached_news,
+                st.session_state.cached_news_key,
+                filters,
+                number,
+                per_page
+            )
+
+        results = view_page(page)
+
+        if lazy:
+            results['articles'] = enrich_articles(results['articles'], filters['topic'])
+            if page < results['pages']:
+                prefetch_enrichment(view_page(page + 1)['articles'], filters['topic'])
+
+        return results
 
     if hasattr(st.session_state, 'filters'):
         # Get current page from session state
@@ -178,27 +179,8 @@ else:  # Results page
             # Display results count and pagination info
             st.write(f"Found {results['total']} articles • Page {results['current_page']} of {results['pages']}")
 
-            # Display articles
-            for article in results['articles']:
-                try:
-                    source_domain = article['source'].split('/')[0]
-                    logo_url = f"https://logo.clearbit.com/{source_domain}"
-
-                    # Create article card with error handling
-                    st.markdown(f"""
-                        <div class="news-card">
-                            <img src="{logo_url}" class="news-logo" onerror="this.src='https://placehold.co/60x60?text=📰'">
-                            <div class="news-content">
-                                <h3>{article['title']}</h3>
-                                <p>Source: {article['source']} | Published: {format_date(article['published_at'])}</p>
-                                <p>{article.get('content', '')[:200]}...</p>
-                                <a href="{article['url']}" target="_blank">Read More</a>
-                            </div>
-                        </div>
-                    """, unsafe_allow_html=True)
-                except Exception as e:
-                    print(f"Error displaying article: {e}")
-                    continue
+            # Display articles; cards are cached per URL, so reruns only re-emit HTML
+            st.markdown(render_cards(results['articles']), unsafe_allow_html=True)
 
             # Pagination controls
             cols = st.columns(4)
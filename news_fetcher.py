@@ -1,51 +1,163 @@
-import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import json
-from news_sources import get_news_sources
+from news_sources import extract_article_content, get_news_sources
+from bias_analyzer import analyze_bias
 import time
-from openai import OpenAI
-from search_agent import SearchAgent
+from services import get_openai_client, get_search_agent
+from result_cache import Uncached, get_result_cache, make_result_key
+from single_flight import SingleFlight, coalesced_create
+from metrics import count_articles, stage_timer, timed
+from article_index import index_articles
 import concurrent.futures
+import threading
 import streamlit as st
 from functools import partial
+from collections import OrderedDict
 
-# Initialize OpenAI client with better error handling
-client = None
-try:
-    openai_api_key = os.environ.get("OPENAI_API_KEY")
-    if openai_api_key:
-        client = OpenAI(api_key=openai_api_key)
-    else:
-        print("Warning: OPENAI_API_KEY not found in environment variables")
-except Exception as e:
-    print(f"Error initializing OpenAI client: {e}")
-
-# Initialize search agent with retry mechanism
-max_retries = 3
-for attempt in range(max_retries):
-    try:
-        search_agent = SearchAgent()
-        break
-    except Exception as e:
-        if attempt == max_retries - 1:
-            print(f"Failed to initialize search agent after {max_retries} attempts: {e}")
-            search_agent = None
-        time.sleep(2 ** attempt)  # Exponential backoff
+# Seconds fetch_news waits for each source before returning without it
+SOURCE_TIME_BUDGETS = {
+    'RSSNewsSource': 12.0,
+    'GDELTNewsSource': 6.0,
+    'GoogleNewsSource': 8.0
+}
+DEFAULT_TIME_BUDGET = 10.0
+SOURCE_RESULT_TTL = 300  # Matches the fetch_from_source cache lifetime
+
+# Long-lived pool so sources that miss their budget keep running in the
+# background and their results are reused by the next identical request
+source_executor = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="news-source")
+source_fetches = {}  # (source class, query, days_ago, extract_content) -> (future, submitted_at)
+source_fetches_lock = threading.Lock()
+# Polling interval while a source is still queued behind other queries' fetches
+QUEUED_SOURCE_POLL = 0.1
 
 @st.cache_data(ttl=300)  # Cache results for 5 minutes
-def fetch_from_source(source, query: str, days_ago: int) -> List[Dict[str, Any]]:
-    """Fetch articles from a single source with caching"""
+def fetch_from_source(_source, query: str, days_ago: int, source_name: str,
+                      extract_content: bool = True) -> List[Dict[str, Any]]:
+    """
+    Fetch articles from a single source with caching.
+    Sources are not hashable, so the cache is keyed on source_name (the source class) instead.
+    """
     try:
-        articles = source.fetch_articles(query, days_ago)
+        articles = _source.fetch_articles(query, days_ago, extract_content)
         return articles
     except Exception as e:
         print(f"Error fetching from source: {e}")
         return []
 
-def fetch_news(query: str, days_ago: int, source_count: int) -> List[Dict[str, Any]]:
+def _run_source_fetch(started_at: List[float], *args) -> List[Dict[str, Any]]:
+    # Budgets count from here, not from submission, so time spent queued is not charged
+    started_at.append(time.monotonic())
+    return fetch_from_source(*args)
+
+def submit_source_fetch(source, query: str, days_ago: int, extract_content: bool = True) -> concurrent.futures.Future:
+    """Start fetching from a source, or join a fetch for the same query that is still running or fresh"""
+    key = (type(source).__name__, query, days_ago, extract_content)
+    now = time.time()
+    with source_fetches_lock:
+        # Drop finished fetches that have outlived the cache TTL
+        for stale_key in [k for k, (f, t) in source_fetches.items() if f.done() and now - t > SOURCE_RESULT_TTL]:
+            del source_fetches[stale_key]
+
+        entry = source_fetches.get(key)
+        if entry is not None:
+            return entry[0]
+
+        started_at = []
+        future = source_executor.submit(_run_source_fetch, started_at, source, query, days_ago, key[0], extract_content)
+        future.started_at = started_at
+        source_fetches[key] = (future, now)
+        return future
+
+def collect_within_budgets(future_to_source: Dict[concurrent.futures.Future, Any],
+                           overruns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Gather results from each source until it completes or its time budget runs out.
+    A budget starts when the source's fetch starts running (or when this call began,
+    for a fetch that was already running), so waiting in the shared pool's queue
+    doesn't use it up. Sources that ran out are appended to `overruns`.
+    """
+    started = time.monotonic()
+
+    def deadline(future) -> Optional[float]:
+        started_at = getattr(future, 'started_at', None)
+        if started_at is not None and not started_at:
+            return None  # Still queued
+        began = max(started_at[0], started) if started_at else started
+        return began + SOURCE_TIME_BUDGETS.get(type(future_to_source[future]).__name__, DEFAULT_TIME_BUDGET)
+
+    all_articles = []
+    pending = set(future_to_source)
+    while pending:
+        deadlines = [deadline(f) for f in pending]
+        known = [d for d in deadlines if d is not None]
+        timeout = max(min(known) - time.monotonic(), 0) if known else QUEUED_SOURCE_POLL
+        if len(known) < len(deadlines):
+            timeout = min(timeout, QUEUED_SOURCE_POLL)
+        done, pending = concurrent.futures.wait(pending, timeout=timeout,
+                                                return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            try:
+                all_articles.extend(future.result())
+            except Exception as e:
+                print(f"Source fetch failed: {e}")
+
+        now = time.monotonic()
+        for future in list(pending):
+            future_deadline = deadline(future)
+            if future_deadline is not None and future_deadline <= now:
+                # Leave it running; the result warms the cache for the next request
+                name = type(future_to_source[future]).__name__
+                print(f"{name} exceeded its time budget, continuing in background")
+                if overruns is not None:
+                    overruns.append(name)
+                pending.discard(future)
+
+    return all_articles
+
+def fetch_news(query: str, days_ago: int, source_count: int, use_budgets: bool = True) -> List[Dict[str, Any]]:
+    """
+    Main function to fetch and process news articles using multiple sources with parallel processing.
+    Results are shared across sessions through the process-wide result cache, and concurrent
+    identical queries wait on a single pipeline run.
     """
-    Main function to fetch and process news articles using multiple sources with parallel processing
+    key = make_result_key(query, days_ago, source_count, use_budgets)
+    return get_result_cache().get_or_compute(
+        key, partial(run_and_index, query, days_ago, source_count, use_budgets)
+    )
+
+def fetch_news_metadata(query: str, days_ago: int, source_count: int) -> List[Dict[str, Any]]:
+    """
+    Fetch, filter and rank articles without full-text extraction or AI enhancement.
+    Articles carry feed/search snippets as content; enrich_articles completes them page by page.
+    """
+    key = make_result_key(query, days_ago, source_count) + "|metadata"
+    return get_result_cache().get_or_compute(
+        key, partial(run_and_index, query, days_ago, source_count, metadata_only=True)
+    )
+
+def run_and_index(*args, **kwargs):
+    """
+    Run the pipeline and make its articles searchable by the chatbot.
+    Results missing a source that ran past its budget are returned but not cached.
+    """
+    overruns = []
+    articles = run_news_pipeline(*args, overruns=overruns, **kwargs)
+    index_articles(articles)
+    if overruns:
+        print(f"Not caching partial results, missing: {', '.join(overruns)}")
+        return Uncached(articles)
+    return articles
+
+@timed('pipeline')
+def run_news_pipeline(query: str, days_ago: int, source_count: int, use_budgets: bool = True,
+                      metadata_only: bool = False, overruns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch, filter and enhance articles without the result cache.
+    With use_budgets, each source gets a time budget and whatever has arrived when it expires is used;
+    sources that ran out are appended to `overruns`.
+    With metadata_only, full-text extraction and AI enhancement are skipped.
     """
     try:
         print(f"Fetching news for query: {query}")
@@ -53,40 +165,52 @@ def fetch_news(query: str, days_ago: int, source_count: int) -> List[Dict[str, A
         # Get all configured news sources
         news_sources = get_news_sources()
 
-        # Use ThreadPoolExecutor for parallel fetching
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            # Create partial function with fixed arguments
-            fetch_func = partial(fetch_from_source, query=query, days_ago=days_ago)
-
-            # Submit all fetch tasks
-            future_to_source = {executor.submit(fetch_func, source): source 
-                              for source in news_sources}
-
-            # Collect results as they complete
-            all_articles = []
-            for future in concurrent.futures.as_completed(future_to_source):
-                try:
-                    articles = future.result()
-                    all_articles.extend(articles)
-                except Exception as e:
-                    print(f"Source fetch failed: {e}")
+        if use_budgets:
+            future_to_source = {submit_source_fetch(source, query, days_ago, not metadata_only): source
+                                for source in news_sources}
+            all_articles = collect_within_budgets(future_to_source, overruns)
+        else:
+            # Use ThreadPoolExecutor for parallel fetching
+            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+                # Create partial function with fixed arguments
+                fetch_func = partial(fetch_from_source, query=query, days_ago=days_ago,
+                                     extract_content=not metadata_only)
+
+                # Submit all fetch tasks
+                future_to_source = {executor.submit(fetch_func, source, source_name=type(source).__name__): source 
+                                  for source in news_sources}
+
+                # Collect results as they complete
+                all_articles = []
+                for future in concurrent.futures.as_completed(future_to_source):
+                    try:
+                        articles = future.result()
+                        all_articles.extend(articles)
+                    except Exception as e:
+                        print(f"Source fetch failed: {e}")
 
         print(f"Total articles retrieved: {len(all_articles)}")
+        count_articles('retrieved', len(all_articles))
 
         if not all_articles:
             return []
 
         # Pre-filter articles before AI processing
         filtered_articles = all_articles
+        search_agent = get_search_agent()
         if search_agent:
             try:
                 filtered_articles = search_agent.process_articles(all_articles, query)
                 print(f"Search agent filtered to {len(filtered_articles)} relevant articles")
+                count_articles('ranked', len(filtered_articles))
             except Exception as e:
                 print(f"Error in search agent processing: {e}")
 
+        if metadata_only:
+            return filtered_articles[:source_count]
+
         # Skip AI enhancement if OpenAI client is not available
-        if client is None:
+        if get_openai_client() is None:
             print("Skipping AI enhancement due to missing OpenAI API key")
             return filtered_articles[:source_count]
 
@@ -95,7 +219,7 @@ def fetch_news(query: str, days_ago: int, source_count: int) -> List[Dict[str, A
             enhanced_articles = []
             batch_size = 10  # Smaller batch size for better parallelization
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+            with stage_timer('enhancement'), concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
                 # Split articles into batches
                 batches = [filtered_articles[i:i + batch_size] 
                           for i in range(0, len(filtered_articles), batch_size)]
@@ -129,6 +253,7 @@ def fetch_news(query: str, days_ago: int, source_count: int) -> List[Dict[str, A
 @st.cache_data(ttl=900)  # Cache for 15 minutes
 def enhance_articles_batch(batch: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
     """Helper function to enhance a batch of articles with AI processing"""
+    client = get_openai_client()
     if not client:  # Skip if OpenAI client is not available
         return batch
 
@@ -142,7 +267,8 @@ def enhance_articles_batch(batch: List[Dict[str, Any]], query: str) -> List[Dict
             "query": query
         }
 
-        response = client.chat.completions.create(
+        response = coalesced_create(
+            client.chat.completions.create,
             model="gpt-4",
             messages=[{
                 "role": "system",
@@ -163,7 +289,8 @@ def enhance_articles_batch(batch: List[Dict[str, Any]], query: str) -> List[Dict
         result = json.loads(response.choices[0].message.content)
         enhanced_batch = result.get("articles", [])
 
-        # Merge enhanced data with original articles
+        # Merge enhanced data into copies; the input articles may be shared
+        batch = [dict(article) for article in batch]
         for i, enhanced in enumerate(enhanced_batch):
             if i < len(batch):
                 batch[i].update(enhanced)
@@ -171,4 +298,65 @@ def enhance_articles_batch(batch: List[Dict[str, Any]], query: str) -> List[Dict
         return batch
     except Exception as e:
         print(f"Error in batch enhancement: {e}")
-        return batch  # Return original batch on error
\ No newline at end of file
+        return batch  # Return original batch on error
+
+ENRICHED_CACHE_SIZE = 2048  # Enriched articles kept across all sessions
+
+# (url, query) -> article with full text, bias scores and AI enhancement
+enriched_articles = OrderedDict()
+enriched_articles_lock = threading.Lock()
+# Page enrichments in flight, so a page being prefetched is not enriched twice
+enrichment_flights = SingleFlight()
+enrichment_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="page-enrich")
+
+def _enrich_batch(articles: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    """Extract full text, then enhance and score a batch of metadata-only articles"""
+    with stage_timer('enrichment'):
+        batch = [dict(article) for article in articles]  # Metadata is shared; never mutate it
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+            # Same as eager mode: sources that only provide excerpts (GDELT) are not extracted
+            to_extract = [a for a in batch if not a.get('excerpt_only')]
+            contents = executor.map(lambda a: extract_article_content(a['url'], a.get('content', '')), to_extract)
+            for article, content in zip(to_extract, contents):
+                article['content'] = content
+
+        if get_openai_client() is not None:
+            batch = enhance_articles_batch(batch, query)
+
+        for article in batch:
+            if 'political_bias' not in article:
+                # No AI enhancement; fall back to the lexicon-based scores
+                article.update(analyze_bias(article['content'], article['source']))
+
+        with enriched_articles_lock:
+            for article in batch:
+                enriched_articles[(article['url'], query)] = article
+                enriched_articles.move_to_end((article['url'], query))
+            while len(enriched_articles) > ENRICHED_CACHE_SIZE:
+                enriched_articles.popitem(last=False)
+        # Replaces the indexed feed snippets with the full text
+        index_articles(batch)
+        return batch
+
+def enrich_articles(articles: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    """
+    Complete a page of metadata-only articles (full text, bias and AI enhancement).
+    Articles enriched before, e.g. by a prefetch, are reused.
+    """
+    with enriched_articles_lock:
+        missing = [a for a in articles if (a['url'], query) not in enriched_articles]
+
+    if missing:
+        try:
+            flight_key = (query, tuple(a['url'] for a in missing))
+            enrichment_flights.do(flight_key, _enrich_batch, missing, query)
+        except Exception as e:
+            print(f"Error enriching articles: {e}")
+
+    with enriched_articles_lock:
+        return [enriched_articles.get((a['url'], query), a) for a in articles]
+
+def prefetch_enrichment(articles: List[Dict[str, Any]], query: str):
+    """Enrich articles in the background, e.g. the next page while the current one is read"""
+    if articles:
+        enrichment_executor.submit(enrich_articles, articles, query)
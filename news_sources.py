@@ -2,147 +2,99 @@ import os
 from typing import List, Dict, Any
 import requests
 from datetime import datetime, timedelta
-import trafilatura
-import xml.etree.ElementTree as ET
 from urllib.request import urlopen
 from urllib.error import URLError
-import time
 import re
+from rate_limiter import get_upstream_guard
+from feed_parser import iter_feed_items
+from date_parser import parse_date
+from query_matcher import compile_query, normalize_query
+from services import lazy_import
+from metrics import count_articles, stage_timer
 
 def get_datetime(date_str):
     """Convert string to timezone-aware datetime"""
-    try:
-        if date_str.endswith('Z'):
-            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        elif '+' in date_str or '-' in date_str[10:]:
-            return datetime.fromisoformat(date_str)
-        else:
-            return datetime.fromisoformat(date_str + '+00:00')
-    except Exception:
+    published = parse_date(date_str)
+    if published is None:
         return datetime.now().astimezone()
+    return published
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def extract_article_content(url: str, fallback: str, source: str = '') -> str:
+    """Download an article page and extract its full text, or return the fallback"""
+    try:
+        with stage_timer('extraction', source=source):
+            article_response = requests.get(url, headers=BROWSER_HEADERS, timeout=5)
+            if article_response.status_code == 200:
+                extracted = lazy_import('trafilatura').extract(article_response.text)
+                if extracted:
+                    return extracted
+    except Exception as e:
+        print(f"Error extracting content from {url}: {e}")
+    return fallback
 
 class NewsSource:
     """Base class for news sources"""
-    def fetch_articles(self, query: str, days: int) -> List[Dict[str, Any]]:
+    def fetch_articles(self, query: str, days: int, extract_content: bool = True) -> List[Dict[str, Any]]:
+        """
+        Fetch matching articles. Without extract_content, 'content' is the feed or
+        search snippet and full-text extraction is left to the caller.
+        """
         raise NotImplementedError
 
 def clean_search_term(query: str) -> str:
     """Clean and prepare search terms for advanced matching"""
-    # Common variations and misspellings
-    corrections = {
-        'vollyball': 'volleyball',
-        'basket ball': 'basketball',
-        'base ball': 'baseball',
-        'foot ball': 'football',
-        'volley ball': 'volleyball',
-        'bball': 'basketball',
-        'bsball': 'baseball',
-        'fball': 'football'
-    }
-
-    # Clean the query
-    query = query.lower().strip()
-
-    # Apply corrections
-    for misspelling, correction in corrections.items():
-        if misspelling in query:
-            query = query.replace(misspelling, correction)
-
-    return query
+    return normalize_query(query)
 
 def is_relevant_content(text: str, search_terms: List[str]) -> bool:
     """
-    Enhanced relevance checking with support for multiple terms
+    Enhanced relevance checking with support for multiple terms.
+    Prefer compile_query(query).matches(text) when checking many texts.
     """
     if not text or not search_terms:
         return False
-
-    text = text.lower()
-
-    # Handle special search operators
-    for term in search_terms:
-        if term.startswith('"') and term.endswith('"'):
-            # Exact phrase match
-            phrase = term.strip('"').lower()
-            if phrase not in text:
-                return False
-        elif '|' in term:
-            # OR operator
-            alternatives = [alt.strip().lower() for alt in term.split('|')]
-            if not any(alt in text for alt in alternatives):
-                return False
-        else:
-            # Regular term match
-            if term not in text:
-                return False
-
-    return True
+    return compile_query(' '.join(search_terms)).matches(text)
 
 class RSSNewsSource(NewsSource):
     """RSS Feed news source using trafilatura"""
     def __init__(self, feed_urls: List[str]):
         self.feed_urls = feed_urls
 
-    def fetch_articles(self, query: str, days: int) -> List[Dict[str, Any]]:
-        # Clean and prepare search terms
-        query = clean_search_term(query)
-        search_terms = [term.strip() for term in query.split()]
+    def fetch_articles(self, query: str, days: int, extract_content: bool = True) -> List[Dict[str, Any]]:
+        # Compile the search terms once for every item in every feed
+        matcher = compile_query(query)
 
         articles = []
         cutoff_date = datetime.now().astimezone() - timedelta(days=days)
 
         for feed_url in self.feed_urls:
             try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                response = requests.get(feed_url, headers=headers, timeout=10)
-                response.raise_for_status()
+                with stage_timer('source_fetch', source='rss', feed=feed_url.split('/')[2]):
+                    response = requests.get(feed_url, headers=BROWSER_HEADERS, timeout=10)
+                    response.raise_for_status()
 
-                tree = ET.fromstring(response.content)
-
-                # Handle different RSS versions
-                if 'rss' in tree.tag:
-                    items = tree.findall('.//item')
-                else:  # Atom feed
-                    items = tree.findall('.//{http://www.w3.org/2005/Atom}entry')
-
-                for item in items:
+                # Stream items in one pass; old items are dropped by the parser
+                for item in iter_feed_items(response.content, cutoff_date, get_datetime):
+                    count_articles('feed_items', 1, source='rss')
                     try:
-                        # Extract data based on feed type
-                        if 'rss' in tree.tag:
-                            title = item.find('title').text if item.find('title') is not None else ''
-                            link = item.find('link').text if item.find('link') is not None else ''
-                            pub_date = item.find('pubDate').text if item.find('pubDate') is not None else ''
-                            description = item.find('description').text if item.find('description') is not None else ''
-                        else:  # Atom feed
-                            title = item.find('{http://www.w3.org/2005/Atom}title').text if item.find('{http://www.w3.org/2005/Atom}title') is not None else ''
-                            link = item.find('{http://www.w3.org/2005/Atom}link').get('href') if item.find('{http://www.w3.org/2005/Atom}link') is not None else ''
-                            pub_date = item.find('{http://www.w3.org/2005/Atom}updated').text if item.find('{http://www.w3.org/2005/Atom}updated') is not None else ''
-                            description = item.find('{http://www.w3.org/2005/Atom}summary').text if item.find('{http://www.w3.org/2005/Atom}summary') is not None else ''
-
-                        if not all([title, link, pub_date]):
-                            continue
-
-                        published = get_datetime(pub_date)
+                        title = item['title']
+                        link = item['link']
+                        description = item['description']
 
-                        if published < cutoff_date:
+                        if not all([title, link, item['pub_date']]):
                             continue
 
+                        published = item['published']
+
                         # Enhanced relevance checking
-                        content_to_check = f"{title} {description}".lower()
-                        if query.lower() == "all" or is_relevant_content(content_to_check, search_terms):
-                            try:
-                                content = description
-                                if link:
-                                    article_response = requests.get(link, headers=headers, timeout=5)
-                                    if article_response.status_code == 200:
-                                        extracted = trafilatura.extract(article_response.text)
-                                        if extracted:
-                                            content = extracted
-                            except Exception as e:
-                                print(f"Error extracting content from {link}: {e}")
-                                content = description
+                        if matcher.matches(f"{title} {description}"):
+                            count_articles('relevant', 1, source='rss')
+                            content = description
+                            if extract_content:
+                                content = extract_article_content(link, description, source='rss')
 
                             articles.append({
                                 'title': title,
@@ -160,6 +112,7 @@ class RSSNewsSource(NewsSource):
                 print(f"Error fetching RSS feed {feed_url}: {e}")
                 continue
 
+        count_articles('fetched', len(articles), source='rss')
         return articles
 
 def get_news_sources() -> List[NewsSource]:
@@ -203,17 +156,16 @@ class GDELTNewsSource(NewsSource):
     """GDELT news source with rate limiting"""
     def __init__(self):
         self.base_url = "https://api.gdeltproject.org/api/v2/doc/doc"
-        self.last_request_time = 0
-        self.min_request_interval = 1.0  # Minimum time between requests in seconds
+        # Rate limit and circuit state is shared process-wide across instances
+        self.guard = get_upstream_guard('gdelt')
 
-    def fetch_articles(self, query: str, days: int) -> List[Dict[str, Any]]:
-        try:
-            # Implement rate limiting
-            current_time = time.time()
-            time_since_last_request = current_time - self.last_request_time
-            if time_since_last_request < self.min_request_interval:
-                time.sleep(self.min_request_interval - time_since_last_request)
+    def fetch_articles(self, query: str, days: int, extract_content: bool = True) -> List[Dict[str, Any]]:
+        # GDELT only returns excerpts, so there is nothing to extract here
+        cache_key = (query, days)
+        if not self.guard.acquire():
+            return self.guard.get_last_good(cache_key)
 
+        try:
             timespan = str(int(days * 24 * 60))
 
             params = {
@@ -225,16 +177,13 @@ class GDELTNewsSource(NewsSource):
                 'maxrecords': 50  # Limit results to avoid rate limiting
             }
 
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-
-            response = requests.get(self.base_url, params=params, headers=headers, timeout=10)
-            self.last_request_time = time.time()
+            with stage_timer('source_fetch', source='gdelt'):
+                response = requests.get(self.base_url, params=params, headers=BROWSER_HEADERS, timeout=10)
 
             if response.status_code == 429:  # Too Many Requests
                 print("Rate limited by GDELT, backing off...")
-                return []
+                self.guard.record_failure(response.headers.get('Retry-After'))
+                return self.guard.get_last_good(cache_key)
 
             response.raise_for_status()
             data = response.json()
@@ -251,17 +200,22 @@ class GDELTNewsSource(NewsSource):
                                 'source': domain,
                                 'content': article.get('excerpt', ''),
                                 'url': article.get('url', ''),
-                                'published_at': article.get('seendate', datetime.now().isoformat())
+                                'published_at': get_datetime(article.get('seendate', '')).isoformat(),
+                                # Kept as an excerpt; lazy enrichment must not download it either
+                                'excerpt_only': True
                             })
                     except Exception as e:
                         print(f"Error processing GDELT article: {e}")
                         continue
 
+            count_articles('fetched', len(articles), source='gdelt')
+            self.guard.record_success(cache_key, articles)
             return articles
 
         except Exception as e:
             print(f"Error fetching from GDELT: {e}")
-            return []
+            self.guard.record_failure()
+            return self.guard.get_last_good(cache_key)
 
 class GoogleNewsSource(NewsSource):
     """Google Custom Search news source"""
@@ -269,21 +223,19 @@ class GoogleNewsSource(NewsSource):
         self.api_key = os.environ.get("GOOGLE_SEARCH_API_KEY")
         self.search_engine_id = os.environ.get("GOOGLE_SEARCH_ENGINE_ID")
         self.base_url = "https://www.googleapis.com/customsearch/v1"
-        self.last_request_time = 0
-        self.min_request_interval = 1.0  # Minimum time between requests
+        # Rate limit and circuit state is shared process-wide across instances
+        self.guard = get_upstream_guard('google')
 
-    def fetch_articles(self, query: str, days: int) -> List[Dict[str, Any]]:
+    def fetch_articles(self, query: str, days: int, extract_content: bool = True) -> List[Dict[str, Any]]:
         if not self.api_key or not self.search_engine_id:
             print("Google Search credentials not configured")
             return []
 
-        try:
-            # Implement rate limiting
-            current_time = time.time()
-            time_since_last_request = current_time - self.last_request_time
-            if time_since_last_request < self.min_request_interval:
-                time.sleep(self.min_request_interval - time_since_last_request)
+        cache_key = (query, days, extract_content)
+        if not self.guard.acquire():
+            return self.guard.get_last_good(cache_key)
 
+        try:
             # Prepare search query
             # If query is in quotes, keep it as is; otherwise, add news-related terms
             if not (query.startswith('"') and query.endswith('"')):
@@ -298,22 +250,19 @@ class GoogleNewsSource(NewsSource):
                 'safe': 'active'
             }
 
-            response = requests.get(self.base_url, params=params, timeout=10)
-            self.last_request_time = time.time()
+            with stage_timer('source_fetch', source='google'):
+                response = requests.get(self.base_url, params=params, timeout=10)
 
             if response.status_code == 429:  # Too Many Requests
                 print("Rate limited by Google Search API, backing off...")
-                return []
+                self.guard.record_failure(response.headers.get('Retry-After'))
+                return self.guard.get_last_good(cache_key)
 
             response.raise_for_status()
             data = response.json()
             articles = []
 
             if 'items' in data:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-
                 for item in data['items']:
                     try:
                         url = item.get('link', '')
@@ -322,14 +271,8 @@ class GoogleNewsSource(NewsSource):
 
                         # Extract full article content
                         content = item.get('snippet', '')
-                        try:
-                            article_response = requests.get(url, headers=headers, timeout=5)
-                            if article_response.status_code == 200:
-                                extracted = trafilatura.extract(article_response.text)
-                                if extracted:
-                                    content = extracted
-                        except Exception as e:
-                            print(f"Error extracting content from {url}: {e}")
+                        if extract_content:
+                            content = extract_article_content(url, content, source='google')
 
                         articles.append({
                             'title': item.get('title', ''),
@@ -343,8 +286,11 @@ class GoogleNewsSource(NewsSource):
                         print(f"Error processing Google Search result: {e}")
                         continue
 
+            count_articles('fetched', len(articles), source='google')
+            self.guard.record_success(cache_key, articles)
             return articles
 
         except Exception as e:
             print(f"Error fetching from Google Search: {e}")
-            return []
\ No newline at end of file
+            self.guard.record_failure()
+            return self.guard.get_last_good(cache_key)
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+NLTK data used by bias_analyzer, provisioned ahead of time instead of downloaded at runtime.
+
+Provision once at build time, on a machine with internet access:
+
+    python nltk_resources.py --download
+
+The data lands in ./nltk_data (or $NLTK_RESOURCES_DIR) and is shipped with the
+app. At runtime the directory is only validated and loaded, never downloaded into.
+"""
+import argparse
+import os
+import sys
+import threading
+from typing import Dict, List
+
+NLTK_RESOURCES_DIR = os.environ.get(
+    "NLTK_RESOURCES_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "nltk_data")
+)
+
+# Package name -> path nltk.data.find looks up
+REQUIRED_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'vader_lexicon': 'sentiment/vader_lexicon.zip'
+}
+
+_status: Dict[str, bool] = {}
+_status_lock = threading.Lock()
+
+
+def ensure_nltk_resources() -> Dict[str, bool]:
+    """
+    Point NLTK at the bundled data and check each resource, once per process.
+    Returns package name -> available. Missing resources are reported, not downloaded.
+    """
+    with _status_lock:
+        if _status:
+            return dict(_status)
+
+        import nltk
+
+        if NLTK_RESOURCES_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_RESOURCES_DIR)
+
+        for package, resource in REQUIRED_RESOURCES.items():
+            try:
+                nltk.data.find(resource)
+                _status[package] = True
+            except LookupError:
+                _status[package] = False
+
+        missing = [package for package, available in _status.items() if not available]
+        if missing:
+            print(f"Warning: NLTK resources missing: {', '.join(missing)}. "
+                  f"Run 'python nltk_resources.py --download' at build time.")
+        return dict(_status)
+
+
+def has_resource(package: str) -> bool:
+    return ensure_nltk_resources().get(package, False)
+
+
+def warmup():
+    """
+    Validate the resources and load them into memory before the first request.
+    Call from the parent process before workers fork so they share the loaded data.
+    """
+    from services import get_service
+
+    ensure_nltk_resources()
+    get_service('sentiment_analyzer')
+    if has_resource('punkt') or has_resource('punkt_tab'):
+        try:
+            # Loads and caches the punkt model
+            from nltk.tokenize import sent_tokenize, word_tokenize
+            word_tokenize(sent_tokenize("Warm up the tokenizer. It is cached afterwards.")[0])
+        except LookupError as e:
+            print(f"Tokenizer warmup failed: {e}")
+
+
+def download(packages: List[str], directory: str = NLTK_RESOURCES_DIR) -> bool:
+    """Download resources into the bundle directory (build time only)"""
+    import nltk
+
+    os.makedirs(directory, exist_ok=True)
+    ok = True
+    for package in packages:
+        ok = nltk.download(package, download_dir=directory, quiet=True) and ok
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--download', action='store_true', help='Download the required resources into the bundle directory')
+    args = parser.parse_args()
+
+    if args.download and not download(list(REQUIRED_RESOURCES)):
+        return 1
+
+    status = ensure_nltk_resources()
+    for package, available in status.items():
+        print(f"{package:<15}{'ok' if available else 'MISSING'}")
+    return 0 if all(status.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+# Common variations and misspellings
+SPELLING_CORRECTIONS = {
+    'vollyball': 'volleyball',
+    'basket ball': 'basketball',
+    'base ball': 'baseball',
+    'foot ball': 'football',
+    'volley ball': 'volleyball',
+    'bball': 'basketball',
+    'bsball': 'baseball',
+    'fball': 'football'
+}
+
+# A quoted phrase, or a run of non-space characters (which may contain | alternatives)
+TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, trim and correct common misspellings in a search query"""
+    query = (query or '').lower().strip()
+    for misspelling, correction in SPELLING_CORRECTIONS.items():
+        if misspelling in query:
+            query = query.replace(misspelling, correction)
+    return query
+
+
+class CompiledQuery:
+    """
+    A search query parsed once into clauses that are ANDed together, where each
+    clause matches if any of its alternatives is a substring of the text.
+
+    Syntax (see the search help text in main.py):
+    - "exact phrase" matches the phrase as written
+    - a|b matches either term
+    - terms separated by spaces must all match
+    """
+    def __init__(self, query: str, clauses: Tuple[Tuple[str, ...], ...]):
+        self.query = query
+        self.clauses = clauses
+        self.match_all = not clauses or query == 'all'
+
+    def matches(self, text: str) -> bool:
+        """Whether the text satisfies the query"""
+        if self.match_all:
+            return True
+        if not text:
+            return False
+        text = text.lower()
+        return all(any(alt in text for alt in clause) for clause in self.clauses)
+
+    def matches_article(self, article: Dict[str, Any], fields: Sequence[str] = ('title', 'content')) -> bool:
+        """Match against the given article fields joined together"""
+        return self.matches(' '.join(str(article.get(field) or '') for field in fields))
+
+    def filter_articles(self, articles: Iterable[Dict[str, Any]],
+                        fields: Sequence[str] = ('title', 'content')) -> List[Dict[str, Any]]:
+        """Articles whose fields satisfy the query"""
+        if self.match_all:
+            return list(articles)
+        return [article for article in articles if self.matches_article(article, fields)]
+
+    def mask(self, df, columns: Sequence[str] = ('title', 'content')):
+        """Vectorized boolean mask over DataFrame text columns"""
+        import pandas as pd
+
+        if self.match_all:
+            return pd.Series(True, index=df.index)
+
+        lowered = [df[column].fillna('').astype(str).str.lower() for column in columns if column in df.columns]
+        result = pd.Series(True, index=df.index)
+        for clause in self.clauses:
+            clause_mask = pd.Series(False, index=df.index)
+            for alt in clause:
+                for column in lowered:
+                    clause_mask |= column.str.contains(alt, regex=False)
+            result &= clause_mask
+        return result
+
+    def sql_clause(self, columns: Sequence[str] = ('title',)) -> Tuple[str, List[str]]:
+        """SQL condition and parameters using ILIKE with the same semantics"""
+        if self.match_all:
+            return 'TRUE', []
+
+        conditions = []
+        params = []
+        for clause in self.clauses:
+            alternatives = []
+            for alt in clause:
+                pattern = '%' + alt.replace('\\', '\\\\').replace('%', r'\%').replace('_', r'\_') + '%'
+                for column in columns:
+                    alternatives.append(f"{column} ILIKE %s")
+                    params.append(pattern)
+            conditions.append('(' + ' OR '.join(alternatives) + ')')
+        return ' AND '.join(conditions), params
+
+    def __repr__(self) -> str:
+        return f"CompiledQuery({self.query!r}, {self.clauses!r})"
+
+
+@lru_cache(maxsize=256)
+def compile_query(query: str) -> CompiledQuery:
+    """Parse a search query once so it can be evaluated cheaply many times"""
+    query = normalize_query(query)
+    clauses = []
+    for phrase, term in TOKEN_PATTERN.findall(query):
+        if phrase:
+            alternatives = (phrase.strip(),)
+        else:
+            alternatives = tuple(alt.strip().strip('"') for alt in term.split('|'))
+        alternatives = tuple(alt for alt in alternatives if alt)
+        if alternatives:
+            clauses.append(alternatives)
+    return CompiledQuery(query, tuple(clauses))
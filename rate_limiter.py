@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Hashable, List, Optional
+
+# Requests per second and burst size for each upstream API. These are shared by
+# every NewsSource instance in the process, so concurrent sessions draw from the
+# same budget instead of each keeping its own last_request_time.
+UPSTREAM_LIMITS = {
+    'gdelt': {'rate': 1.0, 'capacity': 1},
+    'google': {'rate': 1.0, 'capacity': 2},
+}
+DEFAULT_LIMIT = {'rate': 1.0, 'capacity': 1}
+
+FAILURE_THRESHOLD = 3  # Consecutive failures before the circuit opens
+RESET_TIMEOUT = 60.0  # Seconds the circuit stays open before a trial request
+MAX_WAIT = 5.0  # Longest a caller will block waiting for a token
+LAST_GOOD_SIZE = 64  # Number of (query, days) results kept per upstream
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a Retry-After header (seconds or HTTP date) to a delay in seconds"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket"""
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout: float = MAX_WAIT) -> bool:
+        """Take one token, waiting up to timeout seconds. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the given number of seconds (e.g. after a 429)"""
+        with self.lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = now
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open trial after a timeout"""
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_until = 0.0
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self.opened_until
+
+    def allow_request(self) -> bool:
+        """Whether a request may go upstream. Only one trial is let through when half-open."""
+        with self.lock:
+            if self.failures < self.failure_threshold:
+                return True
+            if time.monotonic() < self.opened_until or self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """Give back a half-open trial slot that was not used, without counting a failure"""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_until = 0.0
+            self.trial_in_flight = False
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                self.opened_until = time.monotonic() + max(self.reset_timeout, retry_after or 0.0)
+
+
+class UpstreamGuard:
+    """Rate limiter, circuit breaker and last-good-results store for one upstream API"""
+    def __init__(self, name: str, rate: float, capacity: int):
+        self.name = name
+        self.bucket = TokenBucket(rate, capacity)
+        self.breaker = CircuitBreaker()
+        self.last_good: "OrderedDict[Hashable, List[Dict[str, Any]]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Check the circuit and wait for a token. False means skip the upstream call."""
+        if not self.breaker.allow_request():
+            print(f"Circuit open for {self.name}, serving last good results")
+            return False
+        if not self.bucket.acquire():
+            self.breaker.release_trial()
+            print(f"Rate limit wait exceeded for {self.name}, serving last good results")
+            return False
+        return True
+
+    def record_success(self, key: Hashable, articles: List[Dict[str, Any]]):
+        self.breaker.record_success()
+        with self.lock:
+            self.last_good[key] = articles
+            self.last_good.move_to_end(key)
+            while len(self.last_good) > LAST_GOOD_SIZE:
+                self.last_good.popitem(last=False)
+
+    def record_failure(self, retry_after: Optional[str] = None):
+        """Count a failure; a Retry-After header also pauses the token bucket"""
+        delay = parse_retry_after(retry_after)
+        if delay:
+            self.bucket.pause(delay)
+        self.breaker.record_failure(delay)
+
+    def get_last_good(self, key: Hashable) -> List[Dict[str, Any]]:
+        with self.lock:
+            return list(self.last_good.get(key, []))
+
+
+_guards: Dict[str, UpstreamGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_upstream_guard(name: str) -> UpstreamGuard:
+    """Get the process-wide guard for an upstream, creating it on first use"""
+    with _guards_lock:
+        guard = _guards.get(name)
+        if guard is None:
+            limits = UPSTREAM_LIMITS.get(name, DEFAULT_LIMIT)
+            guard = UpstreamGuard(name, limits['rate'], limits['capacity'])
+            _guards[name] = guard
+        return guard
@@ -0,0 +1,185 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from hashlib import md5
+from typing import Any, Callable, NamedTuple, Optional
+
+from metrics import record_cache
+from query_matcher import normalize_query
+from single_flight import SingleFlight
+
+RESULT_TTL = 300  # Seconds, matches the per-source fetch cache
+MEMORY_CACHE_SIZE = 128  # Distinct queries kept in process memory
+
+# "memory" (default), "file:/path/to/dir" or a redis:// URL
+RESULT_CACHE_URL = os.environ.get("NEWS_RESULT_CACHE", "memory")
+
+
+def make_result_key(query: str, days_ago: int, source_count: int, use_budgets: bool = True) -> str:
+    """Cache key from the normalized query, the requested time window and whether source budgets applied"""
+    return f"{normalize_query(query)}|{days_ago}d|{source_count}|{'budgeted' if use_budgets else 'complete'}"
+
+
+def copy_result(value: Any) -> Any:
+    """A caller's own copy of a cached article list: a new list of new dicts"""
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+class Uncached(NamedTuple):
+    """Returned by a compute function to hand back a value without caching it, e.g. a partial result"""
+    value: Any
+
+
+class MemoryBackend:
+    """Process-wide LRU with expiry; values are stored and returned as is"""
+    def __init__(self, max_size: int = MEMORY_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self.lock:
+            self.entries[key] = (time.time() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+
+class FileBackend:
+    """Pickled results in a directory, shared by every worker on the host"""
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, md5(key.encode()).hexdigest() + ".pkl")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return value if expires_at >= time.time() else None
+
+    def set(self, key: str, value: Any, ttl: float):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((time.time() + ttl, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)  # Atomic, so readers never see partial files
+        except OSError as e:
+            print(f"Result cache write error: {e}")
+
+
+class RedisBackend:
+    """Results in Redis, shared by every worker and host"""
+    def __init__(self, url: str):
+        import redis  # Optional dependency, only needed for this backend
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            data = self.client.get(f"news_results:{key}")
+        except Exception as e:
+            print(f"Result cache read error: {e}")
+            return None
+        return pickle.loads(data) if data else None
+
+    def set(self, key: str, value: Any, ttl: float):
+        try:
+            self.client.setex(f"news_results:{key}", int(ttl), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            print(f"Result cache write error: {e}")
+
+
+class ResultCache:
+    """
+    Process-wide query result cache with single-flight coalescing.
+
+    Hits are served from process memory first; an optional shared backend (file
+    or Redis) lets other workers reuse results too. get_or_compute returns each
+    caller its own copy of the list and article dicts, whatever the backend, so a
+    session changing an article never changes it for others.
+    """
+    def __init__(self, shared_backend=None, ttl: float = RESULT_TTL):
+        self.memory = MemoryBackend()
+        self.shared = shared_backend
+        self.ttl = ttl
+        self.flights = SingleFlight()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.memory.set(key, value, self.ttl)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value, self.ttl)
+        if self.shared is not None:
+            self.shared.set(key, value, self.ttl)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value, or compute it once no matter how many callers ask at the same time"""
+        value = self.get(key)
+        record_cache('news_results', value is not None)
+        if value is None:
+            value = self.flights.do(key, self._compute_and_store, key, compute)
+        return copy_result(value)
+
+    def _compute_and_store(self, key: str, compute: Callable[[], Any]) -> Any:
+        # Another leader may have stored the value between our miss and taking the flight
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = compute()
+        if isinstance(value, Uncached):
+            return value.value
+        if value:  # Empty results usually mean upstream failures, so don't pin them
+            self.set(key, value)
+        return value
+
+
+def create_shared_backend(url: str):
+    """Build the shared backend named by NEWS_RESULT_CACHE, or None for memory only"""
+    try:
+        if url.startswith("file:"):
+            return FileBackend(url[len("file:"):])
+        if url.startswith(("redis://", "rediss://")):
+            return RedisBackend(url)
+    except Exception as e:
+        print(f"Result cache backend unavailable, using memory only: {e}")
+    return None
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Get the process-wide result cache"""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(create_shared_backend(RESULT_CACHE_URL))
+        return _result_cache
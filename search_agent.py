@@ -1,11 +1,11 @@
-import os
 from typing import List, Dict, Any
-from anthropic import Anthropic
 import json
+from single_flight import coalesced_create
+from services import get_anthropic_client
+from metrics import stage_timer
 
 # the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
 # do not change this unless explicitly requested by the user
-anthropic = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
 
 class SearchAgent:
     def __init__(self):
@@ -30,7 +30,8 @@ class SearchAgent:
             }
 
             # Get Claude's analysis
-            response = anthropic.messages.create(
+            response = coalesced_create(
+                get_anthropic_client().messages.create,
                 model=self.model,
                 max_tokens=1024,
                 messages=[{
@@ -77,7 +78,8 @@ class SearchAgent:
                 } for article in articles]
             }
 
-            response = anthropic.messages.create(
+            response = coalesced_create(
+                get_anthropic_client().messages.create,
                 model=self.model,
                 max_tokens=1024,
                 messages=[{
@@ -112,9 +114,11 @@ class SearchAgent:
     def process_articles(self, articles: List[Dict[str, Any]], topic: str) -> List[Dict[str, Any]]:
         """Main method to process and improve article results."""
         # First validate topic relevance with stricter filtering
-        relevant_articles = self.validate_topic_relevance(articles, topic)
+        with stage_timer('relevance_filter'):
+            relevant_articles = self.validate_topic_relevance(articles, topic)
 
         # Then rank the relevant articles
-        ranked_articles = self.rank_articles(relevant_articles, topic)
+        with stage_timer('ranking'):
+            ranked_articles = self.rank_articles(relevant_articles, topic)
 
         return ranked_articles
\ No newline at end of file
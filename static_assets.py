@@ -0,0 +1,50 @@
+import base64
+import os
+import threading
+from hashlib import md5
+
+# Served by Streamlit at app/static/... when server.enableStaticServing is on
+# (see .streamlit/config.toml)
+STATIC_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+_write_lock = threading.Lock()
+
+
+def static_serving_enabled() -> bool:
+    """Whether Streamlit serves the static/ directory"""
+    try:
+        import streamlit as st
+        return bool(st.get_option('server.enableStaticServing'))
+    except Exception:
+        return False
+
+
+def fingerprinted_name(stem: str, data: bytes, ext: str) -> str:
+    """File name that changes with the content, so browsers can cache it indefinitely"""
+    return f"{stem}-{md5(data).hexdigest()[:12]}.{ext}"
+
+
+def write_static_file(subdir: str, name: str, data: bytes) -> str:
+    """Write a file under static/<subdir> once and return its path"""
+    directory = os.path.join(STATIC_ROOT, subdir)
+    path = os.path.join(directory, name)
+    with _write_lock:
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+    return path
+
+
+def static_url(path: str) -> str:
+    """URL of a file under static/ as served by Streamlit"""
+    relative = os.path.relpath(path, STATIC_ROOT).replace(os.sep, '/')
+    return f"app/static/{relative}"
+
+
+def data_url(data: bytes, ext: str) -> str:
+    """Inline base64 data URL, used when static serving is off"""
+    mime = 'svg+xml' if ext == 'svg' else ('jpeg' if ext == 'jpg' else ext)
+    return f"data:image/{mime};base64,{base64.b64encode(data).decode()}"
@@ -1,9 +1,40 @@
 import os
 from typing import Dict, Any
 import json
-from PIL import Image
 import io
-import base64
+from functools import lru_cache
+from services import lazy_import
+from static_assets import data_url, fingerprinted_name, static_serving_enabled, static_url, write_static_file
+
+BACKGROUND_MAX_SIZE = 600  # Pixels; shown at 50% of the viewport behind a 92% white overlay
+
+# (background path, theme colors) -> CSS, built once per process
+_styles_cache: Dict[Any, str] = {}
+
+@lru_cache(maxsize=16)
+def get_image_asset_url(image_path: str, max_size: int) -> str:
+    """
+    Resize and optimize an image once per process and return its URL.
+    Served as a fingerprinted static file when static serving is on, otherwise inlined.
+    """
+    try:
+        Image = lazy_import('PIL.Image')
+        with Image.open(image_path) as img:
+            img.thumbnail((max_size, max_size))
+            buffer = io.BytesIO()
+            img.save(buffer, format='PNG', optimize=True)
+        data = buffer.getvalue()
+    except Exception as e:
+        print(f"Error optimizing image {image_path}: {e}")
+        return ''
+
+    if static_serving_enabled():
+        stem = os.path.splitext(os.path.basename(image_path))[0]
+        try:
+            return static_url(write_static_file('generated', fingerprinted_name(stem, data, 'png'), data))
+        except OSError as e:
+            print(f"Error writing static asset for {image_path}: {e}")
+    return data_url(data, 'png')
 
 class ThemeManager:
     def __init__(self):
@@ -28,22 +59,19 @@ class ThemeManager:
             'dropdown_bg': '#E8E1D5'        # Light warm grey for dropdowns
         }
 
-    def _get_image_data_url(self, image_path: str) -> str:
-        """Convert image file to base64 data URL"""
-        try:
-            with open(image_path, 'rb') as img_file:
-                img_data = img_file.read()
-                img_base64 = base64.b64encode(img_data).decode()
-                ext = os.path.splitext(image_path)[1][1:]  # Get extension without dot
-                return f'data:image/{ext};base64,{img_base64}'
-        except Exception as e:
-            print(f"Error loading image {image_path}: {e}")
-            return ''
-
     def get_enhanced_styles(self) -> str:
-        """Return enhanced CSS styles for the application with new branding"""
-        bg_image_url = self._get_image_data_url(self.brand_assets['logo']['background'])
-
+        """Return enhanced CSS styles for the application with new branding, cached per process"""
+        background = self.brand_assets['logo']['background']
+        key = (background, tuple(self.default_theme.items()))
+        styles = _styles_cache.get(key)
+        if styles is None:
+            styles = _styles_cache[key] = self._build_enhanced_styles(
+                get_image_asset_url(background, BACKGROUND_MAX_SIZE)
+            )
+        return styles
+
+    def _build_enhanced_styles(self, bg_image_url: str) -> str:
+        """Build the CSS for the given background image URL"""
         return f"""
         <style>
         /* Global styles */
@@ -1,15 +1,27 @@
-from datetime import datetime
+from functools import lru_cache
 import re
+from typing import Any
+from date_parser import parse_date
 
-def format_date(date_str: str) -> str:
+DISPLAY_FORMAT = "%B %d, %Y %I:%M %p"
+
+def _format(value: Any) -> Any:
+    try:
+        date_obj = parse_date(value)
+        return value if date_obj is None else date_obj.strftime(DISPLAY_FORMAT)
+    except Exception:
+        return value
+
+_format_date_str = lru_cache(maxsize=4096)(_format)
+
+def format_date(date_str: Any) -> Any:
     """
-    Format date string to readable format
+    Format date string (or datetime) to readable format.
+    Returns the input unchanged when it can't be parsed; never raises.
     """
-    try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ")
-        return date_obj.strftime("%B %d, %Y %I:%M %p")
-    except:
-        return date_str
+    if isinstance(date_str, str):
+        return _format_date_str(date_str)
+    return _format(date_str)
 
 def clean_text(text: str) -> str:
     """
@@ -1,23 +1,66 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
+
+# Above this many articles the bias plot shows binned markers instead of one per article
+MAX_SCATTER_POINTS = 2000
+BIAS_BINS = 40  # Bins over the -1..1 bias range when downsampling
+MAX_LEGEND_SOURCES = 8  # Sources beyond the most frequent ones are grouped as "Other"
+
+def cap_sources(sources: pd.Series, max_sources: int = MAX_LEGEND_SOURCES) -> pd.Series:
+    """Keep the most frequent sources and label the rest "Other" """
+    top = sources.value_counts().index[:max_sources]
+    return sources.where(sources.isin(top), "Other")
+
+def bin_bias_points(df: pd.DataFrame, bins: int = BIAS_BINS) -> pd.DataFrame:
+    """
+    Downsample articles to one row per (source, sentiment, bias bin) with a count,
+    positioned at the mean bias score of the bin and labelled with one example title
+    """
+    edges = np.linspace(-1, 1, bins + 1)
+    binned = df.assign(bias_bin=np.clip(np.digitize(df['bias_score'], edges) - 1, 0, bins - 1))
+    points = binned.groupby(['source', 'sentiment', 'bias_bin'], observed=True, dropna=False).agg(
+        bias_score=('bias_score', 'mean'),
+        count=('bias_score', 'size'),
+        title=('title', 'first')
+    ).reset_index()
+    return points
 
 def create_bias_plot(df: pd.DataFrame) -> go.Figure:
     """
-    Create a mobile-friendly interactive scatter plot of bias scores vs sentiment
+    Create a mobile-friendly interactive scatter plot of bias scores vs sentiment.
+    Rendered with WebGL; large article sets are binned and rare sources grouped as "Other".
     """
-    fig = px.scatter(
-        df,
-        x='bias_score',
-        y='sentiment',
-        color='source',
-        size=[20] * len(df),  # Larger points for touch
-        hover_data=['title'],
-        title='Bias Analysis by Source'
-    )
+    # Articles without a source or sentiment are plotted as "Unknown" rather than dropped by groupby
+    df = df.dropna(subset=['bias_score']).fillna({'source': 'Unknown', 'sentiment': 'Unknown', 'title': ''})
+    df = df.assign(source=cap_sources(df['source']))
+    binned = len(df) > MAX_SCATTER_POINTS
+    if binned:
+        df = bin_bias_points(df)
+
+    fig = go.Figure()
+    for source, group in df.groupby('source', sort=False):
+        if binned:
+            # Marker area grows with the number of articles in the bin
+            sizes = np.clip(8 + 4 * np.sqrt(group['count']), 8, 40)
+            hover = group['title'] + '<br>' + group['count'].astype(str) + ' articles'
+        else:
+            sizes = 20  # Larger points for touch
+            hover = group['title']
+        fig.add_trace(go.Scattergl(
+            x=group['bias_score'],
+            y=group['sentiment'],
+            mode='markers',
+            name=source,
+            marker=dict(size=sizes, sizemode='diameter', opacity=0.7),
+            hovertext=hover,
+            hoverinfo='text+x'
+        ))
 
     # Mobile-friendly layout
     fig.update_layout(
+        title='Bias Analysis by Source',
         title_x=0.5,  # Center title
         xaxis_title="Bias Score",
         yaxis_title="Sentiment",